@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from django.apps import AppConfig
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
@@ -16,9 +17,30 @@ class djswconfig(AppConfig):
     module = None
     schema = None
     swagger = None
+    swaggers = None
 
     # startup
     def ready(self):
+        self.swaggers = OrderedDict()
+        schemas = getattr(settings, 'SWAGGER_SCHEMAS', None)
+
+        # several mounted schemas: [{ 'name' : 'v1', 'schema' : ..., 'module' : ... }, ...]
+        if schemas:
+            for entry in schemas:
+                if 'name' not in entry or 'schema' not in entry:
+                    raise ImproperlyConfigured('Each SWAGGER_SCHEMAS entry should have `name` and `schema` keys')
+                if entry['name'] in self.swaggers:
+                    raise ImproperlyConfigured('Schema name "{}" is used more than once in SWAGGER_SCHEMAS'.format(entry['name']))
+
+                self.swaggers[entry['name']] = Swagger(entry['schema'], entry.get('module', None), entry['name'])
+
+            # first one is the default
+            first = schemas[0]
+            self.schema = first['schema']
+            self.module = first.get('module', None)
+            self.swagger = self.swaggers[first['name']]
+            return
+
         self.schema = getattr(settings, 'SWAGGER_SCHEMA', None)
 
         if not self.schema:
@@ -26,3 +48,4 @@ class djswconfig(AppConfig):
         else:
             self.module = getattr(settings, 'SWAGGER_MODULE', None)
             self.swagger = Swagger(self.schema, self.module)
+            self.swaggers[None] = self.swagger
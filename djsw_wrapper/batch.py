@@ -0,0 +1,160 @@
+import re
+import json
+import logging
+
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils import six
+from django.conf import settings
+from django.db import connections
+from django.core.handlers.wsgi import WSGIRequest
+
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+#: default max number of sub-requests in one batch
+BATCH_DEFAULT_MAX = 50
+
+#: default number of threads for parallel batches
+BATCH_DEFAULT_WORKERS = 4
+
+#: outer request attributes set by middlewares which sub-requests should share
+BATCH_SHARED_ATTRS = ['user', 'auth', 'session', '_cached_user', 'csrf_processing_done']
+
+# executes many sub-requests against router handler table in one http request
+class SwaggerBatch(object):
+    def __init__(self, handlers, methods):
+        self.methods = set(methods)
+
+        # regex is compiled once, sub-requests never go through django url resolver
+        self.table = [ (re.compile(regex), data['view']) for regex, data in six.iteritems(handlers) ]
+        self.limit = getattr(settings, 'SWAGGER_BATCH_MAX', BATCH_DEFAULT_MAX)
+        self.workers = getattr(settings, 'SWAGGER_BATCH_WORKERS', BATCH_DEFAULT_WORKERS)
+
+    def resolve(self, path):
+        path = path.lstrip('/')
+
+        for regex, view in self.table:
+            match = regex.match(path)
+
+            if match:
+                return view, match.groupdict()
+
+        return None, None
+
+    #: construct django request sharing headers, cookies and auth with outer one
+    def make_request(self, outer, method, path, query, body):
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        environ = dict(outer.META)
+
+        environ.update({
+            'REQUEST_METHOD' : method.upper(),
+            'SCRIPT_NAME' : '',
+            'PATH_INFO' : '/' + path.lstrip('/'),
+            'QUERY_STRING' : six.moves.urllib.parse.urlencode(query or {}, doseq = True),
+            'CONTENT_TYPE' : 'application/json',
+            'CONTENT_LENGTH' : str(len(payload)),
+            'wsgi.input' : BytesIO(payload)
+        })
+
+        request = WSGIRequest(environ)
+
+        for attr in BATCH_SHARED_ATTRS:
+            if hasattr(outer, attr):
+                setattr(request, attr, getattr(outer, attr))
+
+        return request
+
+    #: what is wrong with sub-request (None if it can be executed)
+    def check(self, item):
+        if not isinstance(item, dict):
+            return 'Sub-request should be an object'
+        if not isinstance(item.get('method', None), six.string_types) or not isinstance(item.get('path', None), six.string_types):
+            return 'Sub-request should contain `method` and `path` strings'
+        if item['method'].lower() not in self.methods:
+            return 'Unsupported method `{}`'.format(item['method'])
+        if not isinstance(item.get('query', None) or {}, dict):
+            return 'Sub-request `query` should be an object'
+
+        return None
+
+    def execute(self, outer, item):
+        error = self.check(item)
+
+        if error:
+            return { 'status' : status.HTTP_400_BAD_REQUEST, 'body' : { 'detail' : error } }
+
+        view, kwargs = self.resolve(item['path'])
+
+        if view is None:
+            return { 'status' : status.HTTP_404_NOT_FOUND, 'body' : { 'detail' : 'Not found' } }
+
+        try:
+            request = self.make_request(outer, item['method'], item['path'], item.get('query', None), item.get('body', None))
+            response = view(request, **kwargs)
+        except Exception:
+            logger.exception('Batch sub-request {} {} failed'.format(item['method'], item['path']))
+            return { 'status' : status.HTTP_500_INTERNAL_SERVER_ERROR, 'body' : { 'detail' : 'Internal server error' } }
+
+        return { 'status' : response.status_code, 'headers' : self.get_headers(response), 'body' : self.get_body(response) }
+
+    #: DRF responses are not rendered, so content type comes from negotiated renderer
+    def get_headers(self, response):
+        headers = dict(response.items())
+
+        if isinstance(response, Response):
+            renderer = getattr(response, 'accepted_renderer', None)
+
+            if renderer is not None:
+                headers['Content-Type'] = renderer.media_type + ('; charset={}'.format(renderer.charset) if renderer.charset else '')
+            else:
+                headers.pop('Content-Type', None)
+
+        return headers
+
+    #: json-friendly body; streamed and binary contents are not embedded
+    def get_body(self, response):
+        if isinstance(response, Response):
+            return response.data
+        if response.streaming or not response.content:
+            return None
+
+        try:
+            return response.content.decode(response.charset)
+        except UnicodeDecodeError:
+            return None
+
+    #: run sub-request in pool thread, thread-local db connections should not leak
+    def execute_threaded(self, outer, item):
+        try:
+            return self.execute(outer, item)
+        finally:
+            for connection in connections.all():
+                connection.close()
+
+    def run(self, request, *args, **kwargs):
+        data = request.data
+        parallel = False
+
+        if isinstance(data, dict):
+            parallel = bool(data.get('parallel', False))
+            data = data.get('requests', None)
+
+        if not isinstance(data, list):
+            return Response({ 'detail' : 'Expected a list of sub-requests' }, status = status.HTTP_400_BAD_REQUEST)
+
+        if len(data) > self.limit:
+            return Response({ 'detail' : 'Too many sub-requests (max {})'.format(self.limit) }, status = status.HTTP_400_BAD_REQUEST)
+
+        outer = request._request
+
+        if parallel and self.workers > 1 and len(data) > 1:
+            with ThreadPoolExecutor(max_workers = min(self.workers, len(data))) as pool:
+                results = list(pool.map(lambda item: self.execute_threaded(outer, item), data))
+        else:
+            results = [ self.execute(outer, item) for item in data ]
+
+        return Response(results, status = status.HTTP_200_OK)
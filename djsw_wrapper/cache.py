@@ -0,0 +1,189 @@
+import json
+import time
+import uuid
+import hashlib
+import threading
+
+from collections import OrderedDict
+from django.utils import six
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from djsw_wrapper.errors import SwaggerValidationError
+from djsw_wrapper.params import VALIDATED_PARAMS_ATTR
+
+#: prefix for cached responses
+CACHE_KEY_PREFIX = 'djsw:response:'
+
+#: prefix for tag generation tokens
+CACHE_TAG_PREFIX = 'djsw:tag:'
+
+#: default time to live of a cached response (seconds)
+CACHE_DEFAULT_TTL = 60
+
+#: default number of responses kept by in-process cache
+CACHE_DEFAULT_SIZE = 1024
+
+class SwaggerLRUCache(object):
+    """ In-process store with size and TTL eviction, mimics django cache api """
+
+    def __init__(self, size = CACHE_DEFAULT_SIZE):
+        self.size = size
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default = None):
+        with self.lock:
+            try:
+                expires, value = self.data[key]
+            except KeyError:
+                return default
+
+            if expires is not None and expires < time.time():
+                del self.data[key]
+                return default
+
+            self.data.move_to_end(key)
+
+            return value
+
+    def set(self, key, value, timeout = None):
+        expires = time.time() + timeout if timeout else None
+
+        with self.lock:
+            self.data[key] = (expires, value)
+            self.data.move_to_end(key)
+
+            while len(self.data) > self.size:
+                self.data.popitem(last = False)
+
+    def add(self, key, value, timeout = None):
+        if self.get(key) is None:
+            self.set(key, value, timeout)
+            return True
+
+        return False
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+#: shared in-process cache, created on first use
+_local_cache = None
+_local_lock = threading.Lock()
+
+#: get django cache by alias or shared in-process cache
+def get_cache_backend(alias = None):
+    global _local_cache
+
+    if alias:
+        return caches[alias]
+
+    with _local_lock:
+        if _local_cache is None:
+            _local_cache = SwaggerLRUCache(getattr(settings, 'SWAGGER_CACHE_SIZE', CACHE_DEFAULT_SIZE))
+
+    return _local_cache
+
+class SwaggerCacheBase(object):
+    def __init__(self, backend, tags):
+        self.backend = backend
+        self.tags = list(tags)
+
+    #: current generation of a tag; changing it makes all tagged entries unreachable
+    def tag_version(self, tag):
+        key = CACHE_TAG_PREFIX + tag
+        version = self.backend.get(key)
+
+        if version is None:
+            # evicted or never set: a fresh token is always safe
+            self.backend.add(key, uuid.uuid4().hex, None)
+            version = self.backend.get(key)
+
+        return version
+
+    def invalidate(self, tag):
+        self.backend.set(CACHE_TAG_PREFIX + tag, uuid.uuid4().hex, None)
+
+# caches successful responses of safe operations
+class SwaggerCachePolicy(SwaggerCacheBase):
+    def __init__(self, path, options):
+        if not isinstance(options, dict):
+            raise SwaggerValidationError('Cache options for path "{}" should be a dictionary'.format(path))
+
+        self.path = path
+        self.ttl = options.get('ttl', CACHE_DEFAULT_TTL)
+        self.vary = list(options.get('vary', []))
+        self.alias = options.get('backend', None)
+
+        super(SwaggerCachePolicy, self).__init__(get_cache_backend(self.alias), [path] + list(options.get('tags', [])))
+
+        # request.META names of varying headers
+        self.meta = [ 'HTTP_' + h.upper().replace('-', '_') for h in self.vary ]
+
+    #: build key from authenticated user, already validated params, url kwargs and varying headers
+    def make_key(self, request, params, kwargs):
+        user = getattr(request, 'user', None)
+
+        parts = [
+            request.method,
+            self.path,
+            user.pk if user is not None and user.is_authenticated else None,
+            sorted(six.iteritems(params)),
+            sorted(six.iteritems(kwargs)),
+            [ request.META.get(m, None) for m in self.meta ],
+            [ self.tag_version(t) for t in self.tags ]
+        ]
+
+        raw = json.dumps(parts, sort_keys = True, default = str)
+
+        return CACHE_KEY_PREFIX + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def finalize(self, response):
+        if self.vary:
+            patch_vary_headers(response, self.vary)
+
+        return response
+
+    def wrap(self, function):
+        policy = self
+
+        def method(cls, request, *args, **kwargs):
+            key = policy.make_key(request, getattr(request, VALIDATED_PARAMS_ATTR, {}), kwargs)
+            cached = policy.backend.get(key)
+
+            # short-circuit the controller
+            if cached is not None:
+                data, code, headers = cached
+                return policy.finalize(Response(data, status = code, headers = headers))
+
+            response = function(cls, request, *args, **kwargs)
+
+            # only plain successful DRF responses can be rebuilt later
+            if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+                policy.backend.set(key, (response.data, response.status_code, dict(response.items())), policy.ttl)
+
+            return policy.finalize(response)
+
+        return method
+
+# drops cached responses after successful mutating operations
+class SwaggerCacheInvalidator(SwaggerCacheBase):
+    def wrap(self, function):
+        invalidator = self
+
+        def method(cls, request, *args, **kwargs):
+            response = function(cls, request, *args, **kwargs)
+            code = getattr(response, 'status_code', None)
+
+            if code is not None and status.is_success(code):
+                for tag in invalidator.tags:
+                    invalidator.invalidate(tag)
+
+            return response
+
+        return method
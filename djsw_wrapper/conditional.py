@@ -0,0 +1,87 @@
+import hashlib
+import calendar
+
+from django.utils.http import http_date, quote_etag
+from django.utils.cache import get_conditional_response
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from djsw_wrapper.errors import SwaggerValidationError
+
+# answers If-None-Match / If-Modified-Since with 304
+class SwaggerConditional(object):
+    def __init__(self, path, options, view = None):
+        if options is True:
+            options = {}
+
+        if not isinstance(options, dict):
+            raise SwaggerValidationError('Conditional options for path "{}" should be a dictionary or `true`'.format(path))
+
+        self.path = path
+
+        # names of controller methods: (self, request, *args, **kwargs) -> etag string / datetime
+        self.etag = options.get('etag', None)
+        self.last_modified = options.get('last_modified', None)
+
+        if view is not None:
+            for name in (self.etag, self.last_modified):
+                if name and not callable(getattr(view, name, None)):
+                    raise SwaggerValidationError('Controller for path "{}" has no method "{}"'.format(path, name))
+
+    #: ask controller for validators before running the handler
+    def precompute(self, cls, request, *args, **kwargs):
+        etag = None
+        last_modified = None
+
+        if self.etag:
+            value = getattr(cls, self.etag)(request, *args, **kwargs)
+            etag = quote_etag(str(value)) if value is not None else None
+
+        if self.last_modified:
+            value = getattr(cls, self.last_modified)(request, *args, **kwargs)
+            last_modified = calendar.timegm(value.utctimetuple()) if value is not None else None
+
+        return etag, last_modified
+
+    #: render response early and hash its content
+    def compute(self, cls, request, response):
+        if not isinstance(response, Response) or response.status_code != status.HTTP_200_OK:
+            return None
+
+        # same attributes DRF sets in finalize_response, so rendering happens once
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = cls.get_renderer_context()
+        response.render()
+
+        return quote_etag(hashlib.md5(response.content).hexdigest())
+
+    def wrap(self, function):
+        conditional = self
+
+        def method(cls, request, *args, **kwargs):
+            etag, last_modified = conditional.precompute(cls, request, *args, **kwargs)
+
+            if etag or last_modified:
+                response = get_conditional_response(request, etag = etag, last_modified = last_modified)
+
+                if response is not None:
+                    return response
+
+            response = function(cls, request, *args, **kwargs)
+
+            if not (etag or last_modified):
+                etag = conditional.compute(cls, request, response)
+
+            if etag:
+                response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+
+            if etag or last_modified:
+                response = get_conditional_response(request, etag = etag, last_modified = last_modified, response = response)
+
+            return response
+
+        return method
@@ -1,14 +1,21 @@
 from django.utils import six
+from djsw_wrapper.utils import Interner
 from djsw_wrapper.router import SwaggerRouter
+from djsw_wrapper.fetch import SwaggerSchemaFetcher, is_remote
 from djsw_wrapper.errors import SwaggerValidationError, SwaggerGenericError
 
 import flex
 import os
 import re
 
+#: definition property lists shared by all loaded schemas
+MODELS = Interner()
+
 class Swagger():
     # handle is local filename, file object, string or url
-    def __init__(self, handle, module):
+    # name is set for one of several mounted schemas
+    def __init__(self, handle, module, name = None):
+        self.name = name
         self.schema = None
         self.module = None
         self.loaded = False
@@ -20,7 +27,10 @@ class Swagger():
         # parse
         # TODO: proper errors
         try:
-            self.schema = flex.load(self.handle)
+            # remote schemas go through on-disk cache
+            source = SwaggerSchemaFetcher().load(self.handle) if is_remote(self.handle) else self.handle
+
+            self.schema = flex.load(source)
             self.module = module
             self.loaded = True
         except:
@@ -39,11 +49,11 @@ class Swagger():
                         model.append(prop)
 
                 if model:
-                    self.models[name] = model
+                    self.models[name] = MODELS.get(model)
 
         # make routes
         if 'paths' in self.schema and 'basePath' in self.schema:
-            self.router = SwaggerRouter(self.schema, self.module, self.models)
+            self.router = SwaggerRouter(self.schema, self.module, self.models, name = self.name)
         else:
             raise SwaggerValidationError('Schema is missing paths and/or basePath values')
 
@@ -0,0 +1,329 @@
+import os
+import copy
+import json
+import stat
+import yaml
+import hashlib
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils import six
+from django.conf import settings
+
+from djsw_wrapper.errors import SwaggerGenericError
+
+logger = logging.getLogger(__name__)
+
+#: default timeout of schema requests (seconds)
+FETCH_DEFAULT_TIMEOUT = 5
+
+#: default number of threads fetching external documents
+FETCH_DEFAULT_WORKERS = 4
+
+#: max number of followed redirects
+FETCH_MAX_REDIRECTS = 5
+
+#: max depth of inlined non-definition refs
+FETCH_MAX_INLINE = 16
+
+#: per-user cache directory, used unless SWAGGER_SCHEMA_CACHE is set
+def default_cache_directory():
+    base = os.environ.get('XDG_CACHE_HOME', None) or os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(base, 'djsw_wrapper')
+
+#: cached files are trusted only if owned by current user and not writable by others
+def is_private(info):
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        return False
+
+    return not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+#: is schema handle a remote resource
+def is_remote(handle):
+    return isinstance(handle, six.string_types) and handle.lower().startswith(('http://', 'https://'))
+
+# keeps idle keep-alive connections per host
+class SwaggerConnectionPool(object):
+    def __init__(self, timeout = FETCH_DEFAULT_TIMEOUT, size = FETCH_DEFAULT_WORKERS):
+        self.size = size
+        self.timeout = timeout
+        self.idle = dict()
+        self.lock = threading.Lock()
+
+    def acquire(self, key):
+        with self.lock:
+            if self.idle.get(key, None):
+                return self.idle[key].pop()
+
+        scheme, netloc = key
+        oftype = six.moves.http_client.HTTPSConnection if scheme == 'https' else six.moves.http_client.HTTPConnection
+
+        return oftype(netloc, timeout = self.timeout)
+
+    def release(self, key, connection):
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+
+            if len(idle) < self.size:
+                idle.append(connection)
+                return
+
+        connection.close()
+
+    #: returns status, lowercased headers and body
+    def request(self, url, headers = None):
+        parts = six.moves.urllib.parse.urlsplit(url)
+        key = (parts.scheme.lower(), parts.netloc)
+        path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        connection = self.acquire(key)
+
+        try:
+            connection.request('GET', path, headers = headers or {})
+            response = connection.getresponse()
+            body = response.read()
+        except Exception:
+            connection.close()
+            raise
+
+        self.release(key, connection)
+
+        return response.status, { k.lower() : v for k, v in response.getheaders() }, body
+
+    def close(self):
+        with self.lock:
+            for idle in self.idle.values():
+                for connection in idle:
+                    connection.close()
+
+            self.idle.clear()
+
+# loads remote schema through on-disk cache, revalidating it with conditional GET;
+# external $ref documents are fetched concurrently and merged into the schema
+class SwaggerSchemaFetcher(object):
+    def __init__(self, directory = None, timeout = None, workers = None):
+        self.directory = directory or getattr(settings, 'SWAGGER_SCHEMA_CACHE', None) or default_cache_directory()
+        self.timeout = timeout or getattr(settings, 'SWAGGER_SCHEMA_TIMEOUT', FETCH_DEFAULT_TIMEOUT)
+        self.workers = workers or getattr(settings, 'SWAGGER_SCHEMA_WORKERS', FETCH_DEFAULT_WORKERS)
+        self.pool = SwaggerConnectionPool(self.timeout, self.workers)
+
+    def paths(self, url):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+        return os.path.join(self.directory, name + '.body'), os.path.join(self.directory, name + '.json')
+
+    #: cache directory can be used only if nobody else can plant files there
+    def trusted(self):
+        try:
+            return is_private(os.stat(self.directory))
+        except OSError:
+            return False
+
+    def read_cache(self, url):
+        body, meta = self.paths(url)
+
+        if not self.trusted():
+            return None, {}
+
+        try:
+            with open(meta, 'rb') as f:
+                if not is_private(os.fstat(f.fileno())):
+                    return None, {}
+
+                headers = json.loads(f.read().decode('utf-8'))
+
+            with open(body, 'rb') as f:
+                if not is_private(os.fstat(f.fileno())):
+                    return None, {}
+
+                return f.read(), headers
+        except (IOError, OSError, ValueError):
+            return None, {}
+
+    def write_cache(self, url, content, headers):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, 0o700)
+
+        if not self.trusted():
+            logger.warning('Schema cache directory {} is not private to current user, not caching {}'.format(self.directory, url))
+            return
+
+        body, meta = self.paths(url)
+        data = { 'url' : url, 'etag' : headers.get('etag', None), 'last_modified' : headers.get('last-modified', None) }
+
+        # replace atomically, other processes may be reading
+        for target, content in [(body, content), (meta, json.dumps(data).encode('utf-8'))]:
+            temp = target + '.{}.tmp'.format(os.getpid())
+
+            with os.fdopen(os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+                f.write(content)
+
+            os.replace(temp, target)
+
+    #: get document bytes: fresh, revalidated or (if origin is unreachable) cached
+    def fetch(self, url):
+        cached, meta = self.read_cache(url)
+        headers = dict()
+
+        if cached is not None:
+            if meta.get('etag', None):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified', None):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        target = url
+
+        try:
+            for attempt in range(FETCH_MAX_REDIRECTS + 1):
+                status, rheaders, body = self.pool.request(target, headers)
+
+                if status in [301, 302, 303, 307, 308] and 'location' in rheaders:
+                    target = six.moves.urllib.parse.urljoin(target, rheaders['location'])
+                    continue
+
+                break
+        except Exception as e:
+            if cached is not None:
+                logger.warning('Schema resource {} is unreachable ({}), using cached copy'.format(url, e))
+                return cached
+
+            raise SwaggerGenericError('Cannot fetch schema resource {}: {}'.format(url, e))
+
+        if status == 304 and cached is not None:
+            return cached
+        if status == 200:
+            self.write_cache(url, body, rheaders)
+            return body
+        if cached is not None:
+            logger.warning('Schema resource {} responded with {}, using cached copy'.format(url, status))
+            return cached
+
+        raise SwaggerGenericError('Cannot fetch schema resource {}: status {}'.format(url, status))
+
+    def parse(self, content):
+        text = content.decode('utf-8')
+
+        try:
+            return json.loads(text)
+        except ValueError:
+            return yaml.safe_load(text)
+
+    #: collect urls of external documents referenced from node
+    def references(self, node, base):
+        found = set()
+
+        if isinstance(node, dict):
+            ref = node.get('$ref', None)
+
+            if isinstance(ref, six.string_types) and not ref.startswith('#'):
+                found.add(six.moves.urllib.parse.urljoin(base, ref).partition('#')[0])
+
+            for value in node.values():
+                found.update(self.references(value, base))
+        elif isinstance(node, list):
+            for value in node:
+                found.update(self.references(value, base))
+
+        return found
+
+    #: fetch all documents reachable from root, level by level, concurrently
+    def fetch_all(self, url, root):
+        docs = { url : root }
+        frontier = self.references(root, url) - set(docs)
+
+        with ThreadPoolExecutor(max_workers = self.workers) as pool:
+            while frontier:
+                frontier = sorted(frontier)
+                contents = list(pool.map(self.fetch, frontier))
+                found = set()
+
+                for doc, content in zip(frontier, contents):
+                    docs[doc] = self.parse(content)
+                    found.update(self.references(docs[doc], doc))
+
+                frontier = found - set(docs)
+
+        return docs
+
+    def load(self, url):
+        try:
+            root = self.parse(self.fetch(url))
+            docs = self.fetch_all(url, root)
+        finally:
+            self.pool.close()
+
+        if len(docs) > 1:
+            SwaggerRefMerger(url, docs).merge()
+
+        return root
+
+# rewrites external refs: definitions are copied into root `definitions`, anything else is inlined
+class SwaggerRefMerger(object):
+    def __init__(self, url, docs):
+        self.url = url
+        self.docs = docs
+        self.root = docs[url]
+        self.imported = dict()
+        self.names = set(self.root.get('definitions', {}))
+
+    def lookup(self, doc, fragment):
+        node = self.docs[doc]
+
+        for part in [x for x in fragment.split('/') if x]:
+            node = node[part.replace('~1', '/').replace('~0', '~')]
+
+        return node
+
+    def import_definition(self, doc, fragment):
+        key = (doc, fragment)
+
+        if key not in self.imported:
+            base = fragment.rstrip('/').split('/')[-1]
+            name = base
+            index = 2
+
+            while name in self.names:
+                name = '{}_{}'.format(base, index)
+                index += 1
+
+            self.names.add(name)
+            self.imported[key] = '#/definitions/' + name
+
+            # register before rewriting, so recursive definitions terminate
+            content = copy.deepcopy(self.lookup(doc, fragment))
+            self.root.setdefault('definitions', {})[name] = content
+            self.rewrite(content, doc, 0)
+
+        return self.imported[key]
+
+    def rewrite(self, node, base, depth):
+        if isinstance(node, dict):
+            ref = node.get('$ref', None)
+
+            if isinstance(ref, six.string_types) and not (base == self.url and ref.startswith('#')):
+                doc, _, fragment = six.moves.urllib.parse.urljoin(base, ref).partition('#')
+
+                if doc == self.url:
+                    node['$ref'] = '#' + fragment
+                elif fragment.startswith('/definitions/'):
+                    node['$ref'] = self.import_definition(doc, fragment)
+                else:
+                    if depth > FETCH_MAX_INLINE:
+                        raise SwaggerGenericError('Too deep external reference {}'.format(ref))
+
+                    content = copy.deepcopy(self.lookup(doc, fragment))
+                    node.pop('$ref')
+                    node.update(content)
+                    self.rewrite(node, doc, depth + 1)
+                    return
+
+            for value in list(node.values()):
+                self.rewrite(value, base, depth)
+        elif isinstance(node, list):
+            for value in node:
+                self.rewrite(value, base, depth)
+
+    def merge(self):
+        self.rewrite(self.root, self.url, 0)
@@ -0,0 +1,45 @@
+from djsw_wrapper.params import VALIDATED_PARAMS_ATTR
+
+#: query param listing requested response properties
+FIELDS_PARAM = 'fields'
+
+#: viewset attribute holding actions with sparse fieldsets
+FIELDS_ACTIONS_ATTR = '_swagger_sparse_actions'
+
+#: schema of injected `fields` param: comma-separated subset of definition properties
+def fields_param(properties):
+    return { 'name' : FIELDS_PARAM, 'in' : 'query', 'type' : 'array', 'collectionFormat' : 'csv',
+             'items' : { 'type' : 'string', 'enum' : list(properties) } }
+
+#: drop unrequested fields from (list) serializer before it produces any data
+def trim_serializer(serializer, fields):
+    target = getattr(serializer, 'child', serializer)
+
+    for name in [x for x in target.fields if x not in fields]:
+        target.fields.pop(name)
+
+    return serializer
+
+#: patch viewset get_serializer once and enable trimming for action
+def sparse_viewset(view, action):
+    actions = view.__dict__.get(FIELDS_ACTIONS_ATTR, None)
+
+    if actions is None:
+        actions = set()
+        original = view.get_serializer
+
+        def get_serializer(self, *args, **kwargs):
+            serializer = original(self, *args, **kwargs)
+
+            if getattr(self, 'action', None) in actions:
+                fields = getattr(self.request, VALIDATED_PARAMS_ATTR, {}).get(FIELDS_PARAM, None)
+
+                if fields:
+                    trim_serializer(serializer, set(fields))
+
+            return serializer
+
+        setattr(view, FIELDS_ACTIONS_ATTR, actions)
+        setattr(view, 'get_serializer', get_serializer)
+
+    actions.add(action)
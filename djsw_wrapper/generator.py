@@ -0,0 +1,121 @@
+import os
+import json
+import codecs
+import hashlib
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils import six
+
+from djsw_wrapper.utils import Template, stringify_keys
+
+#: manifest of generated files, kept in generated package
+GENERATOR_MANIFEST = '.swaggertool.json'
+
+#: bump when generated code changes regardless of schema and templates
+GENERATOR_VERSION = 1
+
+#: templates for group modules and package
+GENERATOR_VIEW_TEMPLATE = 'view.jinja'
+GENERATOR_INIT_TEMPLATE = 'init.jinja'
+
+# writes one module per group, skipping groups whose render inputs are unchanged
+class SwaggerGenerator(object):
+    def __init__(self, directory, workers = None):
+        self.directory = directory
+        self.workers = workers
+        self.template = Template()
+
+        # any template change invalidates everything
+        sources = self.template.source(GENERATOR_VIEW_TEMPLATE) + self.template.source(GENERATOR_INIT_TEMPLATE)
+        self.salt = '{}:{}'.format(GENERATOR_VERSION, hashlib.sha1(sources.encode('utf-8')).hexdigest())
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def load_manifest(self):
+        try:
+            with codecs.open(self.path(GENERATOR_MANIFEST), 'r', 'utf-8') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return { 'files' : {} }
+
+    #: group controllers by module, sorted for stable output
+    def groups(self, enum):
+        groups = OrderedDict()
+
+        for name in sorted(enum):
+            groups.setdefault(enum[name]['group'], []).append((name, enum[name]))
+
+        return groups
+
+    #: hash of everything template gets, resolved response models included
+    def digest(self, entries):
+        inputs = [ (name, data['doc'], data['methods']) for name, data in entries ]
+        raw = json.dumps(stringify_keys(inputs), sort_keys = True, default = str)
+
+        return hashlib.sha1((self.salt + raw).encode('utf-8')).hexdigest()
+
+    def render(self, entries):
+        structure = [ { 'name' : name, 'data' : data } for name, data in entries ]
+
+        return self.template.render(GENERATOR_VIEW_TEMPLATE, names = structure)
+
+    #: write file only if its content differs
+    def write(self, filename, content):
+        target = self.path(filename)
+
+        if os.path.exists(target):
+            with codecs.open(target, 'r', 'utf-8') as f:
+                if f.read() == content:
+                    return False
+
+        with codecs.open(target, 'w', 'utf-8') as f:
+            f.write(content)
+
+        return True
+
+    def render_and_write(self, filename, entries):
+        return self.write(filename, self.render(entries))
+
+    #: returns lists of generated, skipped and removed files
+    def run(self, enum, force = False):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        old = self.load_manifest().get('files', {})
+        files = OrderedDict()
+        dirty = []
+        skipped = []
+
+        for group, entries in six.iteritems(self.groups(enum)):
+            filename = group + '.py'
+            digest = self.digest(entries)
+            files[filename] = { 'hash' : digest, 'classes' : [ name for name, data in entries ] }
+
+            if not force and old.get(filename, {}).get('hash', None) == digest and os.path.exists(self.path(filename)):
+                skipped.append(filename)
+            else:
+                dirty.append((filename, entries))
+
+        # rendering is cheap per module, so threads are enough
+        if len(dirty) > 1:
+            with ThreadPoolExecutor(max_workers = self.workers) as pool:
+                list(pool.map(lambda x: self.render_and_write(*x), dirty))
+        else:
+            for filename, entries in dirty:
+                self.render_and_write(filename, entries)
+
+        # drop modules of groups which are gone from schema
+        removed = [ x for x in old if x not in files and os.path.exists(self.path(x)) ]
+
+        for filename in removed:
+            os.remove(self.path(filename))
+
+        self.write('__init__.py', self.template.render(GENERATOR_INIT_TEMPLATE, modules = [ x[:-3] for x in files ]))
+
+        manifest = { 'version' : GENERATOR_VERSION, 'files' : files }
+        self.write(GENERATOR_MANIFEST, json.dumps(manifest, indent = 2, sort_keys = True))
+
+        return [ x[0] for x in dirty ], skipped, removed
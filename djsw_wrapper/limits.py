@@ -0,0 +1,97 @@
+import threading
+
+from collections import OrderedDict
+from rest_framework import status
+from rest_framework.response import Response
+
+from djsw_wrapper.errors import SwaggerValidationError
+
+#: default Retry-After value for shed requests (seconds)
+LIMIT_DEFAULT_RETRY = 1
+
+# semaphore with bounded wait queue; works wherever the view runs in a thread
+# (threaded WSGI servers, ASGI sync_to_async executor)
+class SwaggerConcurrencyLimit(object):
+    def __init__(self, name, options):
+        if not isinstance(options, dict) or not isinstance(options.get('max', None), int) or options['max'] < 1:
+            raise SwaggerValidationError('Concurrency options for "{}" should contain positive `max` value'.format(name))
+
+        self.name = name
+        self.max = options['max']
+        self.queue = options.get('queue', 0)
+        self.timeout = options.get('timeout_ms', None)
+        self.retry = options.get('retry_after', LIMIT_DEFAULT_RETRY)
+
+        if self.timeout is not None:
+            self.timeout = self.timeout / 1000.0
+
+        self.slots = threading.BoundedSemaphore(self.max)
+        self.lock = threading.Lock()
+
+        self.inflight = 0
+        self.waiting = 0
+        self.shed = 0
+
+    def acquire(self):
+        acquired = self.slots.acquire(False)
+
+        if not acquired:
+            with self.lock:
+                if self.waiting >= self.queue:
+                    self.shed += 1
+                    return False
+
+                self.waiting += 1
+
+            try:
+                acquired = self.slots.acquire(True, self.timeout) if self.timeout is not None else self.slots.acquire()
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+
+                    if not acquired:
+                        self.shed += 1
+
+        if acquired:
+            with self.lock:
+                self.inflight += 1
+
+        return acquired
+
+    def release(self):
+        with self.lock:
+            self.inflight -= 1
+
+        self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            return { 'max' : self.max, 'queue' : self.queue, 'inflight' : self.inflight, 'waiting' : self.waiting, 'shed' : self.shed }
+
+    def wrap(self, function):
+        limit = self
+
+        def method(cls, request, *args, **kwargs):
+            if not limit.acquire():
+                return Response({ 'detail' : 'Service is overloaded, try again later' },
+                    status = status.HTTP_503_SERVICE_UNAVAILABLE, headers = { 'Retry-After' : str(limit.retry) })
+
+            try:
+                return function(cls, request, *args, **kwargs)
+            finally:
+                limit.release()
+
+        return method
+
+#: all limits by operation name
+_registry = OrderedDict()
+
+def register_limit(name, options):
+    limit = SwaggerConcurrencyLimit(name, options)
+    _registry[name] = limit
+
+    return limit
+
+#: current in-flight, waiting and shed counters by operation name
+def get_limits_stats():
+    return OrderedDict((name, limit.stats()) for name, limit in _registry.items())
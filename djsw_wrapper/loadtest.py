@@ -0,0 +1,362 @@
+import io
+import json
+import math
+import time
+import random
+import threading
+
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils import six
+from django.test import Client
+from django.test.client import encode_multipart, BOUNDARY, MULTIPART_CONTENT
+
+from djsw_wrapper.utils import Resolver
+from djsw_wrapper.params import PARAM_MAX_SIZE, PARAM_MIME_TYPES
+from djsw_wrapper.pagination import SwaggerPaginationOptions
+from djsw_wrapper.fieldsets import fields_param
+from djsw_wrapper.router import SCHEMA_PAGINATION, SCHEMA_FIELDS
+
+#: allowed by Swagger 2.0
+LOADTEST_METHODS = ['get', 'put', 'post', 'head', 'patch', 'options', 'delete']
+
+#: separators of array params
+LOADTEST_SEPARATORS = { 'csv' : ',', 'ssv' : ' ', 'tsv' : '\t', 'pipes' : '|' }
+
+#: reported latency percentiles
+LOADTEST_PERCENTILES = [50, 95, 99]
+
+#: how deep nested definitions are generated
+LOADTEST_MAX_DEPTH = 4
+
+#: size of generated file unless limited by schema
+LOADTEST_FILE_SIZE = 1024
+
+#: fills wildcards of allowed mime types
+LOADTEST_MIME_SUBTYPE = 'x-loadtest'
+
+#: generated content of `type: file` param
+SwaggerFileSample = namedtuple('SwaggerFileSample', ['content', 'content_type'])
+
+# generates valid, boundary and invalid requests for every operation of schema
+class SwaggerRequestFactory(object):
+    def __init__(self, schema, seed = None):
+        self.schema = schema
+        self.base = schema.get('basePath', '/').rstrip('/')
+        self.random = random.Random(seed)
+
+    #: value for plain (non-body) schema; `edge` asks for boundary value
+    def value(self, schema, edge = False, depth = 0):
+        if '$ref' in schema:
+            name = Resolver(self.schema, schema['$ref'])
+            return self.value(self.schema['definitions'][name], edge, depth + 1)
+
+        if 'example' in schema and not edge:
+            return schema['example']
+        if 'default' in schema and not edge:
+            return schema['default']
+        if 'enum' in schema:
+            return schema['enum'][-1] if edge else self.random.choice(schema['enum'])
+
+        oftype = schema.get('type', 'object' if 'properties' in schema else 'string')
+
+        if oftype in ['integer', 'number']:
+            low = schema.get('minimum', 0)
+            high = schema.get('maximum', low + 1000)
+
+            if edge:
+                return self.random.choice([low, high])
+
+            return self.random.randint(int(low), int(high)) if oftype == 'integer' else self.random.uniform(low, high)
+        elif oftype == 'boolean':
+            return self.random.choice([True, False])
+        elif oftype == 'array':
+            low = schema.get('minItems', 1)
+            count = schema.get('maxItems', low + 2) if edge else low
+
+            if schema.get('uniqueItems', False):
+                return self.unique(schema.get('items', {}), count, depth + 1)
+
+            return [ self.value(schema.get('items', {}), edge, depth + 1) for x in range(count) ]
+        elif oftype == 'object':
+            if depth > LOADTEST_MAX_DEPTH:
+                return {}
+
+            return { name : self.value(data, edge, depth + 1) for name, data in six.iteritems(schema.get('properties', {})) }
+        elif oftype == 'file':
+            limit = schema.get(PARAM_MAX_SIZE, None)
+            size = limit if edge and limit is not None else min(LOADTEST_FILE_SIZE if edge else 16, limit or LOADTEST_FILE_SIZE)
+
+            return SwaggerFileSample(b'x' * size, self.mime_type(schema))
+        else:
+            low = schema.get('minLength', 1)
+            length = schema.get('maxLength', low) if edge else max(low, min(8, schema.get('maxLength', 8)))
+
+            return ''.join(self.random.choice('abcdefghijklmnopqrstuvwxyz') for x in range(length))
+
+    #: up to `count` distinct items (value space of items may be smaller)
+    def unique(self, schema, count, depth):
+        values = OrderedDict()
+
+        for x in range(count * 4):
+            if len(values) >= count:
+                break
+
+            value = self.value(schema, False, depth)
+            values.setdefault(json.dumps(value, sort_keys = True, default = str), value)
+
+        return list(values.values())
+
+    #: content type allowed by x-swagger-mime-types
+    def mime_type(self, schema):
+        types = schema.get(PARAM_MIME_TYPES, None)
+
+        if not types:
+            return 'application/octet-stream'
+
+        return self.random.choice(types).replace('*', LOADTEST_MIME_SUBTYPE)
+
+    #: value which violates schema or None if one cannot be made
+    def broken(self, schema):
+        if 'enum' in schema:
+            return '__not_in_enum__'
+
+        oftype = schema.get('type', 'string')
+
+        if oftype == 'file':
+            if schema.get(PARAM_MAX_SIZE, None) is not None:
+                return SwaggerFileSample(b'x' * (schema[PARAM_MAX_SIZE] + 1), self.mime_type(schema))
+            if schema.get(PARAM_MIME_TYPES, None):
+                return SwaggerFileSample(b'x', LOADTEST_MIME_SUBTYPE + '/not-allowed')
+
+            return None
+        elif oftype in ['integer', 'number']:
+            if 'minimum' in schema:
+                return schema['minimum'] - 1
+            if 'maximum' in schema:
+                return schema['maximum'] + 1
+
+            return 'not-a-number'
+        elif oftype == 'boolean':
+            return 'not-a-boolean'
+        elif oftype == 'string' and 'maxLength' in schema:
+            return 'x' * (schema['maxLength'] + 1)
+
+        return None
+
+    #: declared params and params injected by router (pagination, sparse fieldsets)
+    def parameters(self, path, tree, method, operation):
+        params = list(tree.get('parameters', [])) + list(operation.get('parameters', []))
+        declared = set([x['name'] for x in params])
+        injected = []
+
+        if method == 'get' and SCHEMA_PAGINATION in operation:
+            injected.extend(SwaggerPaginationOptions(path, operation[SCHEMA_PAGINATION]).params())
+
+        if method == 'get' and operation.get(SCHEMA_FIELDS, False):
+            definition = self.definition(operation)
+
+            if definition:
+                injected.append(fields_param(self.schema['definitions'][definition].get('properties', {})))
+
+        return params + [ x for x in injected if x['name'] not in declared ]
+
+    #: definition returned by operation (directly or as list items)
+    def definition(self, operation):
+        schema = operation.get('responses', {}).get(200, {}).get('schema', {})
+        schema = schema.get('items', {}) if schema.get('type', None) == 'array' else schema
+
+        return Resolver(self.schema, schema['$ref']) if '$ref' in schema else None
+
+    #: assemble request description from param values
+    def build(self, name, method, path, params, values):
+        url = path
+        query = OrderedDict()
+        headers = dict()
+        form = dict()
+        body = None
+
+        for param in params:
+            if param['name'] not in values:
+                continue
+
+            value = values[param['name']]
+            where = param['in']
+
+            if param.get('type', None) == 'array' and where != 'body':
+                fmt = param.get('collectionFormat', 'csv')
+
+                if fmt != 'multi':
+                    value = LOADTEST_SEPARATORS.get(fmt, ',').join(str(x) for x in value)
+
+            if where == 'path':
+                url = url.replace('{' + param['name'] + '}', six.moves.urllib.parse.quote(str(value), safe = ''))
+            elif where == 'query':
+                query[param['name']] = value
+            elif where == 'header':
+                headers[param['name']] = str(value)
+            elif where == 'formData':
+                form[param['name']] = value
+            elif where == 'body':
+                body = value
+
+        return { 'name' : name, 'method' : method, 'path' : self.base + url, 'query' : query,
+                 'headers' : headers, 'form' : form or None, 'body' : body }
+
+    #: yield (operation name, kind, request) for every operation
+    def generate(self, invalid = True):
+        for path, tree in six.iteritems(self.schema.get('paths', {})):
+            for method in [x for x in LOADTEST_METHODS if x in tree]:
+                operation = tree[method]
+                name = '{} {}'.format(method.upper(), self.base + path)
+                params = self.parameters(path, tree, method, operation)
+                required = [ x for x in params if x.get('required', False) or x['in'] == 'path' ]
+
+                def values(edge = False, only = None):
+                    return { x['name'] : self.value(x.get('schema', x), edge) for x in (only if only is not None else params) }
+
+                yield name, 'valid', self.build(name, method, path, params, values())
+                yield name, 'boundary', self.build(name, method, path, params, values(True))
+
+                if not invalid:
+                    continue
+
+                # each broken param gives separate request
+                for param in params:
+                    if param['in'] in ['path', 'body']:
+                        continue
+
+                    wrong = self.broken(param)
+
+                    if wrong is not None:
+                        data = values()
+                        data[param['name']] = wrong
+                        yield name, 'invalid', self.build(name, method, path, params, data)
+
+                # missing required params
+                missing = [ x for x in required if x['in'] not in ['path'] ]
+
+                if missing:
+                    yield name, 'invalid', self.build(name, method, path, params, values(only = [x for x in params if x not in missing]))
+
+# sends generated requests either in-process or to local url
+class SwaggerLoadRunner(object):
+    def __init__(self, url = None, host = 'localhost', timeout = 10):
+        self.url = url.rstrip('/') if url else None
+        self.host = host
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def client(self):
+        client = getattr(self.local, 'client', None)
+
+        if client is None:
+            client = Client(HTTP_HOST = self.host)
+            self.local.client = client
+
+        return client
+
+    #: file objects are made per send, so requests can be repeated
+    def make_file(self, value):
+        f = io.BytesIO(value.content)
+        f.name = 'loadtest.bin'
+        f.content_type = value.content_type
+
+        return f
+
+    def encode(self, request):
+        if request['form'] is not None:
+            form = { k : self.make_file(v) if isinstance(v, SwaggerFileSample) else v for k, v in six.iteritems(request['form']) }
+            return MULTIPART_CONTENT, encode_multipart(BOUNDARY, form)
+        elif request['body'] is not None:
+            return 'application/json', json.dumps(request['body']).encode('utf-8')
+        else:
+            return None, b''
+
+    def send(self, request):
+        query = six.moves.urllib.parse.urlencode(request['query'], doseq = True)
+        path = request['path'] + ('?' + query if query else '')
+        content_type, payload = self.encode(request)
+
+        if self.url is None:
+            extra = { 'HTTP_' + k.upper().replace('-', '_') : v for k, v in six.iteritems(request['headers']) }
+            response = self.client().generic(request['method'].upper(), path, payload, content_type or 'application/octet-stream', **extra)
+
+            return response.status_code
+
+        headers = dict(request['headers'])
+
+        if content_type:
+            headers['Content-Type'] = content_type
+
+        req = six.moves.urllib.request.Request(self.url + path, data = payload or None, headers = headers, method = request['method'].upper())
+
+        try:
+            with six.moves.urllib.request.urlopen(req, timeout = self.timeout) as response:
+                response.read()
+                return response.status
+        except six.moves.urllib.error.HTTPError as e:
+            return e.code
+
+    #: send request and measure it; exceptions count as status 0
+    def measure(self, item):
+        name, kind, request = item
+        start = time.time()
+
+        try:
+            code = self.send(request)
+        except Exception:
+            code = 0
+
+        return name, kind, code, time.time() - start
+
+    def run(self, items, concurrency = 4):
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers = concurrency) as pool:
+            results = list(pool.map(self.measure, items))
+
+        return results, time.time() - start
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+
+    return values[max(0, int(math.ceil(p / 100.0 * len(values))) - 1)]
+
+#: is 4xx answer expected for generated request
+def is_expected_rejection(name, kind, code):
+    if kind == 'invalid':
+        return True
+
+    # generated path ids usually do not exist
+    return code == 404 and '{' in name
+
+#: per operation stats: errors are 5xx/failed requests and invalid requests which were accepted,
+#: unexpected are valid/boundary requests answered with 4xx; both count into error rate
+def summarize(results, elapsed):
+    stats = OrderedDict()
+
+    for name, kind, code, latency in results:
+        entry = stats.setdefault(name, { 'requests' : 0, 'errors' : 0, 'unexpected' : 0, 'rejected' : 0, 'latencies' : [] })
+        entry['requests'] += 1
+        entry['latencies'].append(latency)
+
+        if code == 0 or code >= 500 or (kind == 'invalid' and code < 400):
+            entry['errors'] += 1
+        elif code >= 400 and is_expected_rejection(name, kind, code):
+            entry['rejected'] += 1
+        elif code >= 400:
+            entry['unexpected'] += 1
+
+    for name, entry in six.iteritems(stats):
+        latencies = sorted(entry.pop('latencies'))
+
+        entry['rps'] = entry['requests'] / elapsed if elapsed else 0.0
+        entry['error_rate'] = float(entry['errors'] + entry['unexpected']) / entry['requests']
+
+        for p in LOADTEST_PERCENTILES:
+            entry['p{}'.format(p)] = percentile(latencies, p) * 1000.0
+
+    return stats
@@ -1,32 +1,92 @@
 import os
-import codecs
+import random
 
+from django.apps import apps
 from django.utils import six
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 from django.core.exceptions import ImproperlyConfigured
 
-from djsw_wrapper.core import Swagger
-from djsw_wrapper.utils import Template
-from djsw_wrapper.router import SwaggerRouter
+from djsw_wrapper.generator import SwaggerGenerator
+from djsw_wrapper.loadtest import SwaggerRequestFactory, SwaggerLoadRunner, summarize, LOADTEST_PERCENTILES
 
 class Command(BaseCommand):
     help = "Generates stub controllers for endpoints specified in API scheme (both YAML and JSON are supported)"
 
     def add_arguments(self, parser):
+        parser.add_argument('action', nargs = '?', choices = ['loadtest'], help = 'Run schema-driven load test instead of code generation')
         parser.add_argument('--name', nargs = '?', default = 'controllers', help = 'Name of module to be created (without extenstion)')
         parser.add_argument('--generate', action = 'store_true', dest = 'generate', help = 'Generate handlers according to spec')
+        parser.add_argument('--force', action = 'store_true', dest = 'force', help = 'Regenerate all modules, even unchanged ones')
+        parser.add_argument('--workers', type = int, default = None, help = 'Number of threads rendering modules')
+        parser.add_argument('--schema', default = None, help = 'Name of SWAGGER_SCHEMAS entry (the first one by default)')
+
+        # loadtest
+        parser.add_argument('--url', default = None, help = 'Local server url (in-process WSGI app is used by default)')
+        parser.add_argument('--host', default = 'localhost', help = 'Host header for in-process requests')
+        parser.add_argument('--concurrency', type = int, default = 4, help = 'Number of simultaneous requests')
+        parser.add_argument('--repeat', type = int, default = 10, help = 'How many times each generated request is sent')
+        parser.add_argument('--valid-only', action = 'store_true', dest = 'valid_only', help = 'Do not send invalid requests')
+        parser.add_argument('--seed', type = int, default = None, help = 'Seed for generated values')
+        parser.add_argument('--max-error-rate', type = float, default = None, dest = 'max_error_rate',
+            help = 'Exit with error if any operation has higher error rate')
+
+    #: get loaded Swagger object by SWAGGER_SCHEMAS name
+    def get_swagger(self, options):
+        config = apps.get_app_config('djsw_wrapper')
+
+        if options['schema'] is None:
+            return config.swagger
+
+        if options['schema'] not in config.swaggers:
+            raise CommandError('Unknown schema "{}", available: {}'.format(options['schema'], ', '.join(str(x) for x in config.swaggers)))
+
+        return config.swaggers[options['schema']]
+
+    def loadtest(self, options):
+        schema = self.get_swagger(options).get_schema()
+        factory = SwaggerRequestFactory(schema, options['seed'])
+        runner = SwaggerLoadRunner(options['url'], options['host'])
+
+        items = list(factory.generate(not options['valid_only'])) * options['repeat']
+        random.Random(options['seed']).shuffle(items)
+
+        print('Sending {} requests to {} with concurrency {}...'.format(len(items), options['url'] or 'in-process app', options['concurrency']))
+
+        results, elapsed = runner.run(items, options['concurrency'])
+        stats = summarize(results, elapsed)
+        columns = ['requests', 'errors', 'unexpected', 'rejected', 'rps'] + ['p{}'.format(p) for p in LOADTEST_PERCENTILES]
+
+        print()
+        print('{:<50}'.format('operation') + ''.join('{:>10}'.format(x) for x in columns))
+
+        for name, entry in six.iteritems(stats):
+            print('{:<50}'.format(name) + ''.join('{:>10.4g}'.format(entry[x]) for x in columns))
+
+        print()
+        print('Total: {} requests in {:.2f}s ({:.1f} rps)'.format(len(results), elapsed, len(results) / elapsed if elapsed else 0.0))
+
+        if options['max_error_rate'] is not None:
+            failed = [ name for name, entry in six.iteritems(stats) if entry['error_rate'] > options['max_error_rate'] ]
+
+            if failed:
+                raise CommandError('Error rate exceeded for: {}'.format(', '.join(failed)))
 
     def handle(self, *args, **options):
-        schema = getattr(settings, 'SWAGGER_SCHEMA', None)
-        module = getattr(settings, 'SWAGGER_MODULE', None)
+        schema = getattr(settings, 'SWAGGER_SCHEMA', None) or getattr(settings, 'SWAGGER_SCHEMAS', None)
 
         if not schema:
             raise ImproperlyConfigured('You have to provide SWAGGER_SCHEMA setting pointing to desired schema')
+        if options['action'] == 'loadtest':
+            return self.loadtest(options)
+
+        swagger = self.get_swagger(options)
+        module = swagger.module
+
         if not module:
             raise ImproperlyConfigured('You have to specify desired controller module name in SWAGGER_MODULE setting')
 
-        router = SwaggerRouter()
+        router = swagger.router
 
         print('Inspecting available controllers...')
 
@@ -36,22 +96,28 @@ class Command(BaseCommand):
         print()
         print('Following classes and methods are going to be generated:')
 
-        enum = router.get_enum()
+        enum = router.enum
 
-        for name in enum:
-            print("{} : {}".format(name, [x['method'] for x in enum[name]['methods']]))
+        for name in sorted(enum):
+            print("{}.{} : {}".format(enum[name]['group'], name, [x['method'] for x in enum[name]['methods']]))
 
         if(options['generate']):
-            template = Template()
-            filename = module.split('.')[-1] + '.py'
-            structure = [{ 'name' : name, 'data' : data } for name, data in six.iteritems(enum)]
+            directory = module.split('.')[-1]
+
+            if os.path.exists(directory + '.py'):
+                print('Warning: {}.py is shadowed by generated {} package, consider removing it'.format(directory, directory))
+
+            print('Generating handlers ({})...'.format(directory))
 
-            print('Generating handlers ({})...'.format(filename))
+            generator = SwaggerGenerator(directory, options['workers'])
+            generated, skipped, removed = generator.run(enum, options['force'])
 
-            with codecs.open(filename, 'w', 'utf-8') as f:
-                f.write(template.render(template_name = 'view.jinja', names = structure))
+            for filename in generated:
+                print('  generated {}'.format(filename))
+            for filename in removed:
+                print('  removed {}'.format(filename))
 
-            print('Done.')
+            print('Done: {} generated, {} unchanged, {} removed.'.format(len(generated), len(skipped), len(removed)))
         else:
             print()
             print('Use --generate option to create them')
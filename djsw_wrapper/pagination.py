@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+from rest_framework.response import Response
+from rest_framework.pagination import BasePagination
+
+from djsw_wrapper.utils import LazyClass
+from djsw_wrapper.errors import SwaggerValidationError
+from djsw_wrapper.params import VALIDATED_PARAMS_ATTR
+
+#: supported pagination types
+PAGINATION_TYPES = set(['keyset'])
+
+#: query param holding last seen key
+PAGINATION_CURSOR = 'cursor'
+
+#: query param holding page size
+PAGINATION_LIMIT = 'limit'
+
+#: default max page size
+PAGINATION_DEFAULT_MAX = 500
+
+#: default page size
+PAGINATION_DEFAULT_PAGE = 50
+
+# WHERE key > cursor ORDER BY key LIMIT n, constant time for any depth (if key is indexed)
+class SwaggerKeysetPagination(BasePagination):
+    key = 'id'
+    page = PAGINATION_DEFAULT_PAGE
+
+    def paginate_queryset(self, queryset, request, view = None):
+        params = getattr(request, VALIDATED_PARAMS_ATTR, {})
+        limit = params.get(PAGINATION_LIMIT, None) or self.page
+        cursor = params.get(PAGINATION_CURSOR, None)
+
+        queryset = queryset.order_by(self.key)
+
+        if cursor is not None:
+            queryset = queryset.filter(**{ self.key + '__gt' : cursor })
+
+        # one extra row tells whether there is a next page
+        rows = list(queryset[:limit + 1])
+
+        self.next = getattr(rows[limit - 1], self.key) if len(rows) > limit else None
+
+        return rows[:limit]
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([('next', self.next), ('results', data)]))
+
+# validated options of x-swagger-pagination
+class SwaggerPaginationOptions(object):
+    def __init__(self, path, options):
+        if not isinstance(options, dict) or options.get('type', None) not in PAGINATION_TYPES:
+            raise SwaggerValidationError('Pagination for path "{}" should have `type` of {}'.format(path, sorted(PAGINATION_TYPES)))
+
+        self.key = options.get('key', 'id')
+        self.key_type = options.get('key_type', 'integer')
+        self.max_page = options.get('max_page', PAGINATION_DEFAULT_MAX)
+        self.page = min(options.get('page', PAGINATION_DEFAULT_PAGE), self.max_page)
+
+    #: schema of injected query params
+    def params(self):
+        return [
+            { 'name' : PAGINATION_CURSOR, 'in' : 'query', 'type' : self.key_type },
+            { 'name' : PAGINATION_LIMIT, 'in' : 'query', 'type' : 'integer', 'minimum' : 1, 'maximum' : self.max_page }
+        ]
+
+    #: stub response for list (plain dict, it is rendered into generated code)
+    def wrap_model(self, model):
+        return { 'next' : None, 'results' : model }
+
+    #: pagination class for generated viewsets
+    def as_class(self):
+        pagination = LazyClass('SwaggerKeysetPagination', SwaggerKeysetPagination)
+
+        pagination.set_attr('key', self.key)
+        pagination.set_attr('page', self.page)
+
+        return pagination()
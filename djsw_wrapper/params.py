@@ -1,8 +1,43 @@
+import re
+
 from django.utils.six import iteritems
 from rest_framework import serializers
 
+from djsw_wrapper.utils import Interner
 from djsw_wrapper.errors import SwaggerParameterError
 from djsw_wrapper.makers import SwaggerRequestSerializerMaker
+from djsw_wrapper.uploads import SwaggerUploadLimit
+
+#: max size of uploaded file (bytes)
+PARAM_MAX_SIZE = 'x-swagger-max-size'
+
+#: allowed mime types of uploaded file
+PARAM_MIME_TYPES = 'x-swagger-mime-types'
+
+#: request attribute holding validated parameters
+VALIDATED_PARAMS_ATTR = 'swagger_params'
+
+#: array separators by collectionFormat (`multi` means repeated keys)
+COLLECTION_SEPARATORS = { 'csv' : ',', 'ssv' : ' ', 'tsv' : '\t', 'pipes' : '|', 'multi' : None }
+
+#: textual booleans accepted by array of booleans
+BOOLEAN_VALUES = { 'true' : True, '1' : True, 'false' : False, '0' : False, True : True, False : False, 1 : True, 0 : False }
+
+#: integral decimals accepted by integers (`2.0`), as DRF IntegerField does
+INTEGER_DECIMALS = re.compile(r'\.0*\s*$')
+
+#: integer item converter rejecting booleans and fractions
+def to_integer(value):
+    if type(value) is int:
+        return value
+
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+
+    return int(INTEGER_DECIMALS.sub('', str(value)))
 
 # TODO: rewrite to proper enum
 class ParameterType():
@@ -64,6 +99,107 @@ class ParameterLocation():
         else:
             raise SwaggerParameterError('Unknown parameter location: {0}'.format(string))
 
+# validates the whole list at once: size and uniqueness first, then one coercion pass
+class SwaggerArrayField(serializers.Field):
+    default_error_messages = {
+        'not_a_list': 'Expected a list of items but got type "{input_type}".',
+        'min_items': 'Ensure this list has at least {count} items.',
+        'max_items': 'Ensure this list has no more than {count} items.',
+        'not_unique': 'Items of this list should be unique.',
+        'invalid_item': 'Item {index} is not a valid {oftype}.',
+        'invalid_choice': '"{value}" is not a valid choice.',
+        'min_value': 'Ensure all items are greater than or equal to {limit}.',
+        'max_value': 'Ensure all items are less than or equal to {limit}.',
+        'min_length': 'Ensure all items have at least {limit} characters.',
+        'max_length': 'Ensure all items have no more than {limit} characters.'
+    }
+
+    #: bulk converters of plain item types
+    converters = { 'integer' : to_integer, 'number' : float, 'string' : str, 'boolean' : BOOLEAN_VALUES.__getitem__ }
+
+    def __init__(self, items = None, min_items = None, max_items = None, unique = False, child = None, **kwargs):
+        self.items = items or {}
+        self.min_items = min_items
+        self.max_items = max_items
+        self.unique = unique
+        self.child = child
+        self.oftype = self.items.get('type', 'string')
+        self.choices = set(self.items['enum']) if 'enum' in self.items else None
+
+        super(SwaggerArrayField, self).__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, (str, dict)) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type = type(data).__name__)
+
+        data = list(data)
+
+        # cheap checks before any per-item work
+        if self.max_items is not None and len(data) > self.max_items:
+            self.fail('max_items', count = self.max_items)
+        if self.min_items is not None and len(data) < self.min_items:
+            self.fail('min_items', count = self.min_items)
+        if self.unique and self.duplicated(data):
+            self.fail('not_unique')
+
+        values = self.coerce(data)
+
+        # uniqueness of coerced values (e.g. '1' and '01' are the same integer)
+        if self.unique and self.duplicated(values):
+            self.fail('not_unique')
+
+        if self.choices is not None:
+            wrong = set(values) - self.choices
+
+            if wrong:
+                self.fail('invalid_choice', value = sorted(wrong, key = str)[0])
+
+        self.check_bounds(values)
+
+        return values
+
+    def duplicated(self, values):
+        try:
+            return len(set(values)) != len(values)
+        except TypeError:
+            # unhashable items (objects in body) are left to the handler
+            return False
+
+    def coerce(self, data):
+        convert = self.converters.get(self.oftype, None)
+
+        # nested arrays, files etc. go through regular field
+        if convert is None:
+            return [self.child.run_validation(x) for x in data] if self.child else data
+
+        try:
+            return list(map(convert, data))
+        except (TypeError, ValueError, KeyError):
+            # slow path only to report the first broken item
+            for index, value in enumerate(data):
+                try:
+                    convert(value)
+                except (TypeError, ValueError, KeyError):
+                    self.fail('invalid_item', index = index, oftype = self.oftype)
+
+    def check_bounds(self, values):
+        if not values:
+            return
+
+        if self.oftype in ['integer', 'number']:
+            if 'minimum' in self.items and min(values) < self.items['minimum']:
+                self.fail('min_value', limit = self.items['minimum'])
+            if 'maximum' in self.items and max(values) > self.items['maximum']:
+                self.fail('max_value', limit = self.items['maximum'])
+        elif self.oftype == 'string':
+            if 'minLength' in self.items and min(map(len, values)) < self.items['minLength']:
+                self.fail('min_length', limit = self.items['minLength'])
+            if 'maxLength' in self.items and max(map(len, values)) > self.items['maxLength']:
+                self.fail('max_length', limit = self.items['maxLength'])
+
+    def to_representation(self, value):
+        return list(value)
+
 class SwaggerParameter():
 
     def typemap(self, p):
@@ -72,7 +208,7 @@ class SwaggerParameter():
             ParameterType.Number : serializers.FloatField,
             ParameterType.Integer : serializers.IntegerField,
             ParameterType.Boolean : serializers.BooleanField,
-            ParameterType.Array : serializers.ListField,
+            ParameterType.Array : SwaggerArrayField,
             ParameterType.Enum : serializers.ChoiceField,
             ParameterType.File : serializers.FileField
         }
@@ -81,12 +217,14 @@ class SwaggerParameter():
 
     # TODO: properly handle array and enums
     def __init__(self, schema):
+        self._schema = schema
         self._name = schema['name']
         self._enum = schema.get('enum', None)
         self._items = schema.get('items', None)
         self._oftype = ParameterType(schema['type']).get_type()
         self._location = ParameterLocation.fromString(schema['in'])
         self._required = schema.get('required', False)
+        self._format = schema.get('collectionFormat', 'csv')
 
         # default params
         self._params = { 'required' : self._required }
@@ -99,15 +237,46 @@ class SwaggerParameter():
         if self._oftype == ParameterType.File and self._location is not ParameterLocation.FormData:
             raise SwaggerParameterError('You have to use `formData` location for using file type')
 
+        # limits enforced while file is being received
+        self._upload = None
+
+        if self._oftype == ParameterType.File:
+            self._upload = SwaggerUploadLimit(self._name, schema.get(PARAM_MAX_SIZE, None), schema.get(PARAM_MIME_TYPES, None))
+
+        # numeric bounds
+        if self._oftype in [ParameterType.Integer, ParameterType.Number]:
+            if 'minimum' in schema:
+                self._params['min_value'] = schema['minimum']
+            if 'maximum' in schema:
+                self._params['max_value'] = schema['maximum']
+
         if self._oftype == ParameterType.Array:
-            child = self.typemap(ParameterType(self._items['type']).get_type())
-            self._params = { 'child': child() }
+            if self._format not in COLLECTION_SEPARATORS:
+                raise SwaggerParameterError('Unknown collection format: {0}'.format(self._format))
+
+            child = None
+
+            if self._items.get('type', None) not in SwaggerArrayField.converters:
+                child = SwaggerParameter(dict(self._items, name = self._name, **{ 'in' : schema['in'] })).as_field()
+
+            self._params = { 'items' : self._items, 'min_items' : schema.get('minItems', None), 'max_items' : schema.get('maxItems', None),
+                             'unique' : schema.get('uniqueItems', False), 'child' : child, 'required' : self._required }
+
+        # body arrays are already parsed lists
+        self._separator = None
+
+        if self._oftype == ParameterType.Array and self._location != ParameterLocation.Body:
+            self._separator = COLLECTION_SEPARATORS[self._format]
 
         if self._enum:
             self._oftype = ParameterType.Enum
             self._params = { 'choices' : self._enum }
 
 
+    @property
+    def schema(self):
+        return self._schema
+
     @property
     def name(self):
         return self._name
@@ -124,6 +293,33 @@ class SwaggerParameter():
     def required(self):
         return self._required
 
+    @property
+    def separator(self):
+        return self._separator
+
+    @property
+    def upload(self):
+        return self._upload
+
+    #: split delimited values; repeated keys are still accepted
+    def split(self, value):
+        if value is None or self._separator is None:
+            return value
+
+        if isinstance(value, str):
+            value = [value]
+
+        result = []
+
+        for v in value:
+            if isinstance(v, str):
+                if v:
+                    result.extend(v.split(self._separator))
+            else:
+                result.append(v)
+
+        return result
+
 
     def __repr__(self):
         return "{} ({},{})".format(self._name, self._oftype, self._required)
@@ -149,6 +345,26 @@ class SwaggerParameter():
         # maybe exception?
         return field(**self._params) if field is not None else None
 
+#: parameters and compiled request serializers shared by all loaded schemas
+PARAMETERS = Interner()
+VALIDATORS = Interner()
+
+#: get shared parameter for schema
+def make_parameter(schema):
+    return PARAMETERS.get(schema, SwaggerParameter)
+
+#: get shared serializer class validating all params (built once per distinct param list)
+def make_validator(params):
+    def compile(schemas):
+        serializer = SwaggerRequestSerializerMaker('SwaggerRequestSerializer')
+
+        for param in params:
+            serializer.set_attr(param.name, param.as_field())
+
+        return serializer()
+
+    return VALIDATORS.get([x.schema for x in params], compile)
+
 # automatically validates the data
 def SwaggerRequestHandler(view, handler, params, *args, **kwargs):
 
@@ -180,7 +396,8 @@ def SwaggerRequestHandler(view, handler, params, *args, **kwargs):
                     store = request.data
 
                 if param.oftype == ParameterType.Array:
-                    value = store.getlist(param.name, None)
+                    value = store.getlist(param.name, None) if hasattr(store, 'getlist') else store.get(param.name, None)
+                    value = param.split(value)
                 else:
                     value = store.get(param.name, None)
 
@@ -196,28 +413,32 @@ def SwaggerRequestHandler(view, handler, params, *args, **kwargs):
             validator = self.serializer
 
             def method(cls, request, *args, **kwargs):
-                s_object = validator() # returned obj is already another obj
-                serializer = s_object(data = extractor(request, kwargs))
+                serializer = validator(data = extractor(request, kwargs))
 
                 # validated data is in serializer.data and request can be replaced here,
                 # but let's leave parameters processing to views - they were made for it
                 if serializer.is_valid(raise_exception = True):
+                    setattr(request, VALIDATED_PARAMS_ATTR, serializer.validated_data)
+
                     return function(cls, request, *args, **kwargs)
                 else:
                     pass # s.errors contain detailed error
 
             return method
 
+    # extra processing (caching etc.) goes after validation, innermost first
+    for layer in kwargs.get('layers', None) or []:
+        handler = layer.wrap(handler)
+
     # validate or not
-    if not params:
-        return handler
-    else:
-        serializer = SwaggerRequestSerializerMaker('SwaggerRequestSerializer')
+    if params:
+        validator = SwaggerValidator(view, make_validator(params), handler, params)
 
-        for param in params:
-            serializer.set_attr(param.name, param.as_field())
+        handler = validator.process()
 
-        validator = SwaggerValidator(view, serializer, handler, params)
+    # guards (concurrency limits etc.) go before any request work
+    for guard in kwargs.get('guards', None) or []:
+        handler = guard.wrap(handler)
 
-        return validator.process()
+    return handler
 
@@ -0,0 +1,166 @@
+from django.utils import six
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from djsw_wrapper.utils import Resolver
+from djsw_wrapper.params import VALIDATED_PARAMS_ATTR
+from djsw_wrapper.fieldsets import FIELDS_PARAM
+
+#: how deep nested $refs are followed
+QUERY_MAX_DEPTH = 3
+
+#: viewset attribute holding query planners by action
+QUERY_PLANS_ATTR = '_swagger_query_plans'
+
+#: max number of distinct field subsets kept by planner
+QUERY_MAX_PLANS = 256
+
+#: get definition name of (array of) nested object property
+def nested_ref(data):
+    if '$ref' in data:
+        return Resolver(None, data['$ref'])
+    elif data.get('type', None) == 'array' and '$ref' in data.get('items', {}):
+        return Resolver(None, data['items']['$ref'])
+    else:
+        return None
+
+# maps definition properties onto model fields:
+# columns go to only(), forward relations to select_related(), many relations to prefetch_related()
+class SwaggerQueryPlan(object):
+    def __init__(self, definitions, name, model, fields = None, serializer = None):
+        self.only = set()
+        self.select = set()
+        self.prefetch = set()
+
+        # only() is safe only if every property (and serialized field) is a loaded model field
+        self.complete = True
+
+        self.build(definitions, name, model, str(), 0, False, fields)
+
+        if serializer is not None:
+            self.check(serializer(), model, str(), fields)
+
+    def build(self, definitions, name, model, prefix, depth, prefetched, fields = None):
+        properties = definitions.get(name, {}).get('properties', {})
+
+        for prop, data in six.iteritems(properties):
+            if fields is not None and prop not in fields:
+                continue
+
+            try:
+                field = model._meta.get_field(prop)
+            except FieldDoesNotExist:
+                self.complete = False
+                continue
+
+            lookup = prefix + prop
+            ref = nested_ref(data)
+            follow = ref is not None and depth < QUERY_MAX_DEPTH
+
+            if not field.is_relation:
+                if not prefetched:
+                    self.only.add(lookup)
+            elif (field.many_to_one or field.one_to_one) and field.concrete and not prefetched:
+                self.only.add(lookup)
+
+                # nested object: join it, otherwise only fk value is needed
+                if follow:
+                    self.select.add(lookup)
+                    self.build(definitions, ref, field.related_model, lookup + '__', depth + 1, False)
+            elif follow:
+                # many relations (and everything below them) are fetched by separate queries
+                self.prefetch.add(lookup)
+                self.build(definitions, ref, field.related_model, lookup + '__', depth + 1, True)
+            elif field.many_to_many or field.one_to_many:
+                # list of keys or links still needs related rows
+                self.prefetch.add(lookup)
+
+    #: serializer may read columns which are not described by definition
+    def check(self, serializer, model, prefix, fields = None):
+        for name, field in six.iteritems(serializer.fields):
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+
+            try:
+                column = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                # method fields, properties and dotted sources may touch anything
+                self.complete = False
+                return
+
+            lookup = prefix + field.source
+
+            if column.primary_key or not column.concrete or column.many_to_many:
+                continue
+
+            if lookup not in self.only:
+                self.complete = False
+                return
+
+            # rows of joined objects are narrowed as well, prefetched ones are not
+            if isinstance(field, BaseSerializer) and not isinstance(field, ListSerializer) and lookup in self.select:
+                self.check(field, column.related_model, lookup + '__')
+
+                if not self.complete:
+                    return
+
+    def apply(self, queryset):
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*sorted(self.prefetch))
+        if self.complete and self.only:
+            queryset = queryset.only(*sorted(self.only))
+
+        return queryset
+
+# builds and keeps plans for full definition and requested field subsets
+class SwaggerQueryPlanner(object):
+    def __init__(self, definitions, name, model, optimize = True, serializer = None):
+        self.name = name
+        self.model = model
+        self.plans = dict()
+        self.optimize = optimize
+        self.serializer = serializer
+        self.definitions = definitions
+
+    def get(self, fields = None):
+        # without optimisation only requested subsets narrow the queryset
+        if fields is None and not self.optimize:
+            return None
+
+        key = frozenset(fields) if fields is not None else None
+        plan = self.plans.get(key, None)
+
+        if plan is None:
+            plan = SwaggerQueryPlan(self.definitions, self.name, self.model, key, self.serializer)
+
+            if len(self.plans) < QUERY_MAX_PLANS:
+                self.plans[key] = plan
+
+        return plan
+
+#: patch viewset get_queryset once and register planner for action
+def optimize_viewset(view, action, planner):
+    plans = view.__dict__.get(QUERY_PLANS_ATTR, None)
+
+    if plans is None:
+        plans = dict()
+        original = view.get_queryset
+
+        def get_queryset(self):
+            queryset = original(self)
+            current = plans.get(getattr(self, 'action', None), None)
+
+            if current is None:
+                return queryset
+
+            fields = getattr(self.request, VALIDATED_PARAMS_ATTR, {}).get(FIELDS_PARAM, None)
+            plan = current.get(fields or None)
+
+            return plan.apply(queryset) if plan else queryset
+
+        setattr(view, QUERY_PLANS_ATTR, plans)
+        setattr(view, 'get_queryset', get_queryset)
+
+    plans[action] = planner
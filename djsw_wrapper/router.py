@@ -7,9 +7,18 @@ from django.utils import six
 from django.conf import settings
 from django.conf.urls import url as make_url, include
 
-from djsw_wrapper.utils import Singleton, Template, Resolver, LazyClass
+from djsw_wrapper.utils import Multiton, Interner, Template, Resolver, LazyClass
 from djsw_wrapper.makers import SwaggerViewMaker, SwaggerRequestMethodMaker, SwaggerViewClass
-from djsw_wrapper.params import SwaggerParameter, SwaggerRequestHandler
+from djsw_wrapper.params import SwaggerRequestHandler, make_parameter
+from djsw_wrapper.cache import SwaggerCachePolicy, SwaggerCacheInvalidator, get_cache_backend
+from djsw_wrapper.conditional import SwaggerConditional
+from djsw_wrapper.limits import register_limit, get_limits_stats
+from djsw_wrapper.batch import SwaggerBatch
+from djsw_wrapper.pagination import SwaggerPaginationOptions
+from djsw_wrapper.queries import SwaggerQueryPlanner, optimize_viewset
+from djsw_wrapper.fieldsets import FIELDS_PARAM, fields_param, sparse_viewset
+from djsw_wrapper.uploads import SwaggerUploadGuard, upload_view
+from djsw_wrapper.spec import SwaggerSpec
 from djsw_wrapper.errors import SwaggerValidationError, SwaggerGenericError
 
 from rest_framework import status
@@ -30,6 +39,24 @@ SCHEMA_VIEW_NAME = 'x-swagger-router-view'
 #: what param to use as key when quering single obj
 SCHEMA_OBJECT_KEY = 'x-swagger-object-key'
 
+#: response caching options of operation
+SCHEMA_CACHE = 'x-swagger-cache'
+
+#: conditional GET options of path (or single operation)
+SCHEMA_ETAG = 'x-swagger-etag'
+
+#: concurrency limit of operation
+SCHEMA_CONCURRENCY = 'x-swagger-concurrency'
+
+#: pagination options of list operation
+SCHEMA_PAGINATION = 'x-swagger-pagination'
+
+#: derive only()/select_related()/prefetch_related() from response definition
+SCHEMA_OPTIMIZE = 'x-swagger-optimize'
+
+#: allow clients to request subset of response properties
+SCHEMA_FIELDS = 'x-swagger-fields'
+
 #: django url param substitution
 DJANGO_PARAMS_STRING = r'(?P<\1>[^/.]+)'
 
@@ -45,6 +72,9 @@ SWAGGER_PARAMS_REGEX = re.compile(r'\{(\w?[\w\d]*)\}')
 #: allowed by Swagger 2.0
 SWAGGER_METHODS = set(['get', 'put', 'post', 'head', 'patch', 'options', 'delete'])
 
+#: methods which change resources and thus drop cached responses
+SWAGGER_MUTATING_METHODS = set(['put', 'post', 'patch', 'delete'])
+
 #: borrowed from DRF
 VIEWSET_MAPPING = { 'list': {'post': 'create', 'get': 'list'}, 
                     'detail': {'delete': 'destroy', 'patch': 'partial_update', 'get': 'retrieve', 'put': 'update'} }
@@ -55,6 +85,21 @@ LOOKUP_FIELD_NAME = 'lookup_url_kwarg'
 #: name of apiroot view
 APIROOT_NAME = 'SwaggerAPIRoot'
 
+#: name of batch view
+BATCH_NAME = 'SwaggerBatch'
+
+#: batch view path (relative to basePath)
+BATCH_PATH = 'batch'
+
+#: name of spec views (format is appended)
+SPEC_NAME = 'SwaggerSpec'
+
+#: spec view path (relative to basePath, format is appended)
+SPEC_PATH = 'swagger.{}'
+
+#: stub payloads shared by all loaded schemas
+EXAMPLES = Interner()
+
 # helper shortcut due to failed attempt of runtime serializer class patching
 class SwaggerHyperlinkedRelatedField(HyperlinkedRelatedField):
     def get_url(self, obj, view_name, request, format):
@@ -68,8 +113,7 @@ class SwaggerHyperlinkedRelatedField(HyperlinkedRelatedField):
             return None
 
         # override lookup_url_kwarg
-        router = SwaggerRouter()
-        self.lookup_url_kwarg = router.get_view_key(view_name) or self.lookup_field
+        self.lookup_url_kwarg = SwaggerRouter.find_view_key(view_name) or self.lookup_field
 
         lookup_value = getattr(obj, self.lookup_field)
         kwargs = {self.lookup_url_kwarg: lookup_value}
@@ -83,15 +127,16 @@ class SwaggerHyperlinkedRelatedField(HyperlinkedRelatedField):
         """
 
         # override lookup_url_kwarg
-        router = SwaggerRouter()
-        self.lookup_url_kwarg = router.get_view_key(view_name) or self.lookup_field
+        self.lookup_url_kwarg = SwaggerRouter.find_view_key(view_name) or self.lookup_field
 
         lookup_value = view_kwargs[self.lookup_url_kwarg]
         lookup_kwargs = {self.lookup_field: lookup_value}
         return self.get_queryset().get(**lookup_kwargs)
 
-class SwaggerRouter(Singleton):
-    def __init__(self, schema, module = None, models = None):
+# one router per loaded schema; SwaggerRouter() returns the first (default) one
+class SwaggerRouter(Multiton):
+    def __init__(self, schema, module = None, models = None, name = None):
+        self.name = name
         self.base = schema['basePath']
         self.gen = None
         self.links = []
@@ -101,6 +146,8 @@ class SwaggerRouter(Singleton):
         self.models = models
         self.module = module
         self.handlers = {}
+        self.limits = []
+        self.views = {}
 
         self.process()
 
@@ -124,6 +171,13 @@ class SwaggerRouter(Singleton):
 
         return module
 
+    #: per-router subclass of controller: schemas sharing a module must not wrap the same methods
+    def get_view(self, name, controller):
+        if name not in self.views:
+            self.views[name] = type(controller.__name__, (controller,), { '__module__' : controller.__module__, '__doc__' : controller.__doc__ })
+
+        return self.views[name]
+
     #: get obj key if present
     def get_object_key(self, schemapart):
         return schemapart.get(SCHEMA_OBJECT_KEY, None)
@@ -157,15 +211,25 @@ class SwaggerRouter(Singleton):
             parameters = schemapart[method].get('parameters', None)
             description = schemapart[method].get('description', None)
 
-            methoddata = { 'params' : None, 'model' : None, 'doc' : None }
+            methoddata = { 'params' : None, 'model' : None, 'doc' : None,
+                           'cache' : schemapart[method].get(SCHEMA_CACHE, None),
+                           'etag' : schemapart[method].get(SCHEMA_ETAG, schemapart.get(SCHEMA_ETAG, None)),
+                           'concurrency' : schemapart[method].get(SCHEMA_CONCURRENCY, None),
+                           'pagination' : None,
+                           'definition' : None,
+                           'fields' : False,
+                           'optimize' : schemapart[method].get(SCHEMA_OPTIMIZE, getattr(settings, 'SWAGGER_OPTIMIZE_QUERIES', False)) }
 
             if description:
                 methoddata['doc'] = description
 
-            if parameters:
-                wrapped = list(map(lambda p : SwaggerParameter(p), parameters))
-                methoddata['params'] = wrapped
-                allparams.update([x.name for x in wrapped])
+            # inject cursor/limit params unless they are declared already
+            if method == 'get' and SCHEMA_PAGINATION in schemapart[method]:
+                pagination = SwaggerPaginationOptions(fullpath, schemapart[method][SCHEMA_PAGINATION])
+                declared = set([x['name'] for x in parameters or []])
+
+                parameters = list(parameters or []) + [x for x in pagination.params() if x['name'] not in declared]
+                methoddata['pagination'] = pagination
 
             # TODO: simplify
             # TODO: does anybody really needs this?
@@ -175,15 +239,101 @@ class SwaggerRouter(Singleton):
 
                 schema = successful.get('schema', None)
 
+                if schema and '$ref' in schema:
+                    methoddata['definition'] = Resolver(self.schema, schema['$ref'])
+
                 if schema and schema.get('type', None) == 'array':
                     model = Resolver(self.schema, schema['items']['$ref'])
                     mdict = { x : None for x in self.models[model] }
+                    methoddata['definition'] = model
                     methoddata['model'] = [mdict]
 
+                    if methoddata['pagination']:
+                        methoddata['model'] = methoddata['pagination'].wrap_model(methoddata['model'])
+
+                    methoddata['model'] = EXAMPLES.get(methoddata['model'])
+
+            # inject `fields` param limited to response definition properties
+            if method == 'get' and schemapart[method].get(SCHEMA_FIELDS, False):
+                if methoddata['definition'] not in self.models:
+                    raise SwaggerValidationError('Sparse fieldsets of path "{}" require response schema referencing a definition'.format(fullpath))
+
+                declared = set([x['name'] for x in parameters or []])
+
+                if FIELDS_PARAM not in declared:
+                    parameters = list(parameters or []) + [fields_param(self.models[methoddata['definition']])]
+
+                methoddata['fields'] = True
+
+            if parameters:
+                wrapped = list(map(lambda p : make_parameter(p), parameters))
+                methoddata['params'] = wrapped
+                allparams.update([x.name for x in wrapped])
+
             methods[method] = methoddata
 
         return not namedparams.issubset(allparams), namedparams, methods
 
+    #: build extra request processing layers (innermost first) for operation
+    def make_layers(self, path, method, methods, view = None, stub = False):
+        layers = []
+        options = methods[method]['cache']
+
+        # full path keeps several schemas apart in shared cache
+        fullpath = self.make_fullpath(path)
+
+        if method == 'get':
+            if options:
+                layers.append(SwaggerCachePolicy(fullpath, options))
+
+            # cheap 304 goes before cache lookup and controller
+            etag = methods[method]['etag']
+
+            if etag:
+                # stub handlers have no methods to ask, their constant payload is hashed instead
+                if stub and isinstance(etag, dict):
+                    self.log('Stub handler for path "{}" cannot provide conditional validators, using computed ETag'.format(path))
+                    etag = True
+
+                layers.append(SwaggerConditional(path, etag, view))
+        elif method in SWAGGER_MUTATING_METHODS:
+            options = options or {}
+            cached = methods.get('get', None)
+            alias = options.get('backend', None)
+            tags = list(options.get('invalidate', []))
+
+            # successful mutation drops cached responses of the same path
+            if cached and cached['cache']:
+                tags.append(fullpath)
+                alias = alias or cached['cache'].get('backend', None)
+
+            if tags:
+                layers.append(SwaggerCacheInvalidator(get_cache_backend(alias), tags))
+
+        return layers
+
+    #: build guards running before validation for operation
+    def make_guards(self, path, method, methods, view):
+        guards = []
+        options = methods[method]['concurrency']
+
+        # file params are limited and spooled to disk while being received
+        uploads = [x.upload for x in methods[method]['params'] or [] if x.upload]
+
+        if uploads:
+            guard = SwaggerUploadGuard(uploads)
+            upload_view(view, method, guard)
+            guards.append(guard)
+
+        # outermost: shed requests before validation and handler (DRF initial() has already
+        # run by then, so authentication may have parsed the body)
+        if options:
+            name = '{} {}'.format(method.upper(), self.make_fullpath(path))
+            guards.append(register_limit(name, options))
+            self.limits.append(name)
+
+        return guards
+
     #: construct full url
     def make_fullpath(self, path):
         return six.moves.urllib.parse.urljoin(self.base.rstrip('/') + '/', path.lstrip('/'))
@@ -224,6 +374,29 @@ class SwaggerRouter(Singleton):
         else:
             return name.lower()
 
+    #: url name with namespace of this router (if any)
+    def make_link_name(self, name):
+        return '{}:{}'.format(self.name, name) if self.name else name
+
+    #: find object key of (possibly namespaced) view among all routers
+    @classmethod
+    def find_view_key(cls, viewname):
+        namespace, _, name = viewname.rpartition(':')
+
+        for router in cls.instances():
+            if router.name == (namespace or router.name):
+                key = router.get_view_key(name)
+
+                if key:
+                    return key
+
+        return None
+
+    #: url patterns of all loaded schemas
+    @classmethod
+    def all_urls(cls):
+        return [ x for router in cls.instances() for x in router.urls ]
+
     #: get object key (if set) for specified view
     def get_view_key(self, viewname):
         for reg, data in six.iteritems(self.handlers):
@@ -234,6 +407,7 @@ class SwaggerRouter(Singleton):
 
     #: create root api view
     def get_root_apiview(self):
+        router = self
         handlers = sorted(self.handlers.items(), key = lambda x : x[1]['display'])
 
         def list_handlers(self, request, *args, **kwargs):
@@ -246,7 +420,7 @@ class SwaggerRouter(Singleton):
 
                 if alias != APIROOT_NAME:
                     try:
-                        resp[alias] = reverse(name, args = args, kwargs = kwargs, request = request, format = kwargs.get('format', None))
+                        resp[alias] = reverse(router.make_link_name(name), args = args, kwargs = kwargs, request = request, format = kwargs.get('format', None))
                     except NoReverseMatch:
                         # here we've got a path with defined params which are not specified in request
                         continue
@@ -267,6 +441,42 @@ class SwaggerRouter(Singleton):
 
         return apiroot().as_view()
 
+    #: create batch view executing many operations in one request
+    def get_batch_apiview(self):
+        batch = SwaggerBatch(self.handlers, SWAGGER_METHODS)
+
+        def run_batch(self, request, *args, **kwargs):
+            return batch.run(request, *args, **kwargs)
+
+        view = LazyClass(BATCH_NAME, SwaggerViewClass)
+
+        view.set_attr('post', run_batch)
+        view.set_attr('__doc__', 'Executes list of {method, path, query, body} sub-requests and returns their results')
+
+        return view().as_view()
+
+    #: get generation group (first operation tag or first path segment)
+    def get_group(self, path, schemapart):
+        tags = [ x for m in sorted(SWAGGER_METHODS.intersection(set(schemapart))) for x in schemapart[m].get('tags', []) ]
+        group = tags[0] if tags else path.strip('/').split('/')[0]
+        group = re.sub(r'\W+', '_', group.lower()).strip('_')
+
+        if not group:
+            return 'root'
+
+        return '_' + group if group[0].isdigit() else group
+
+    #: controller description for code generation
+    def describe(self, path, schemapart, methods):
+        doc = []
+
+        for method in sorted(methods):
+            if methods[method]['doc']:
+                doc.extend((method + ':\n' + methods[method]['doc']).splitlines())
+
+        return { 'path' : path, 'group' : self.get_group(path, schemapart), 'doc' : doc or None,
+                 'methods' : [ { 'method' : m, 'model' : methods[m]['model'] } for m in sorted(methods) ] }
+
     #: main schema processing function
     def process(self):
         # try to import controller module first
@@ -274,6 +484,8 @@ class SwaggerRouter(Singleton):
 
         # enumerate all methods for gen
         self.gen = dict()
+        self.limits = []
+        self.views = dict()
 
         # determine parsers and renderers
         # TODO: do we really need this?
@@ -318,11 +530,13 @@ class SwaggerRouter(Singleton):
             if mismatch:
                 raise SwaggerValidationError('Path "{}" lacks parameters schema'.format(path))
 
+            # describe controller for code generation, routes are not needed
+            if self.create:
+                self.gen[name] = self.describe(path, tree, methods)
+                continue
+
             # create stub view object or use existing controller
-            if not self.create:
-                view = controller if controller else SwaggerViewMaker(name)()
-            else:
-                self.gen[name] = { 'methods' : [], 'doc' : doc.splitlines() if doc else None }
+            view = self.get_view(name, controller) if controller else SwaggerViewMaker(name)()
 
             viewset = issubclass(view, GenericViewSet)
 
@@ -333,7 +547,8 @@ class SwaggerRouter(Singleton):
             # for all defined methods, get their handlers from view
             for method, data in six.iteritems(methods):
                 key = self.get_object_key(tree)
-                inner = self.get_viewset_method(method, key)
+                # plain views are not bound to viewset actions
+                inner = self.get_viewset_method(method, key) if viewset else None
                 objname = inner if viewset else method
                 handler = getattr(view, objname, None) if not stub else None
 
@@ -367,8 +582,26 @@ class SwaggerRouter(Singleton):
                     elif stub:
                         raise SwaggerValidationError('There is no object key property ({}) for single queries for path {}'.format(SCHEMA_OBJECT_KEY, path))
 
+                # keyset pagination for generated list
+                if viewset and not key and data['pagination']:
+                    setattr(view, 'pagination_class', data['pagination'].as_class())
+
+                # restrict columns and join nested objects described by response (or requested fields)
+                if viewset and method == 'get' and (data['optimize'] or data['fields']) and data['definition']:
+                    queryset = getattr(view, 'queryset', None)
+
+                    if queryset is not None:
+                        planner = SwaggerQueryPlanner(self.schema.get('definitions', {}), data['definition'], queryset.model, data['optimize'],
+                                                      getattr(view, 'serializer_class', None))
+                        optimize_viewset(view, inner, planner)
+
+                # trim serializer fields before serialization
+                if viewset and data['fields']:
+                    sparse_viewset(view, inner)
+
                 # validation itself
-                wrapped = SwaggerRequestHandler(view, handler, data['params'])
+                wrapped = SwaggerRequestHandler(view, handler, data['params'], layers = self.make_layers(path, method, methods, view, stub),
+                    guards = self.make_guards(path, method, methods, view))
 
                 # write back to view
                 setattr(view, objname, wrapped)
@@ -453,11 +686,33 @@ class SwaggerRouter(Singleton):
             # create API root view
             self.links.append(make_url(self.make_regex(self.base), self.get_root_apiview(), name = APIROOT_NAME))
 
+            # optional pre-encoded spec views
+            if getattr(settings, 'SWAGGER_SERVE_SPEC', False):
+                spec = SwaggerSpec(self.schema)
+
+                for fmt in spec.formats():
+                    regex = self.make_regex(self.make_fullpath(SPEC_PATH.format(fmt))).replace('.', r'\.')
+                    self.links.append(make_url(regex, spec.as_view(fmt), name = SPEC_NAME + '-' + fmt))
+
+            # optional batch view
+            if getattr(settings, 'SWAGGER_BATCH', False):
+                self.links.append(make_url(self.make_regex(self.make_fullpath(BATCH_PATH)), self.get_batch_apiview(), name = BATCH_NAME))
+
     @property
     def enum(self):
         return self.gen
 
+    #: in-flight, waiting and shed request counts of limited operations
+    @property
+    def limits_stats(self):
+        stats = get_limits_stats()
+
+        return OrderedDict((name, stats[name]) for name in self.limits if name in stats)
+
     @property
     def urls(self):
+        if self.name:
+            return [ make_url(r'', include((self.links, self.name), namespace = self.name)) ]
+
         return self.links
 
@@ -0,0 +1,105 @@
+import gzip
+import json
+import hashlib
+
+from django.utils.http import parse_etags
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views.decorators.http import require_safe
+
+from djsw_wrapper.utils import stringify_keys
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+#: served spec formats and their content types
+SPEC_FORMATS = { 'json' : 'application/json', 'yaml' : 'application/x-yaml' }
+
+#: content encodings in order of preference
+SPEC_ENCODINGS = ['br', 'gzip', 'identity']
+
+#: pick best encoding from Accept-Encoding header
+def choose_encoding(header, available):
+    weights = { 'identity' : 0.001 }
+
+    for token in header.split(','):
+        parts = [x.strip() for x in token.split(';')]
+        name = parts[0].lower()
+        q = 1.0
+
+        for part in parts[1:]:
+            if part.startswith('q='):
+                try:
+                    q = float(part[2:])
+                except ValueError:
+                    q = 0.0
+
+        if name:
+            weights[name] = q
+
+    candidates = [ x for x in SPEC_ENCODINGS if x in available and weights.get(x, weights.get('*', 0.0)) > 0 ]
+
+    return max(candidates, key = lambda x: weights.get(x, weights.get('*', 0.0))) if candidates else 'identity'
+
+# schema encoded once at startup in every format and encoding
+class SwaggerSpec(object):
+    def __init__(self, schema):
+        # keys are sorted for stable hash, so int response codes become strings first
+        content = json.dumps(stringify_keys(schema), sort_keys = True, separators = (',', ':'), default = str).encode('utf-8')
+
+        # schema hash is the same for all representations
+        self.digest = hashlib.sha256(content).hexdigest()[:32]
+        self.variants = { 'json' : self.encode('json', content) }
+
+        if yaml is not None:
+            # round trip through json to get plain builtin types
+            text = yaml.safe_dump(json.loads(content.decode('utf-8')), default_flow_style = False, allow_unicode = True)
+            self.variants['yaml'] = self.encode('yaml', text.encode('utf-8'))
+
+    def encode(self, fmt, content):
+        variants = { 'identity' : content, 'gzip' : gzip.compress(content, 9, mtime = 0) }
+
+        if brotli is not None:
+            variants['br'] = brotli.compress(content)
+
+        # strong etag differs per representation
+        return { encoding : (body, '"{}-{}-{}"'.format(self.digest, fmt, encoding)) for encoding, body in variants.items() }
+
+    def formats(self):
+        return list(self.variants)
+
+    def serve(self, request, fmt):
+        variant = self.variants[fmt]
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), variant)
+        body, etag = variant[encoding]
+
+        matches = request.META.get('HTTP_IF_NONE_MATCH', None)
+
+        if matches and (matches.strip() == '*' or etag in parse_etags(matches)):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type = SPEC_FORMATS[fmt])
+            response['Content-Length'] = str(len(body))
+
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+
+        response['ETag'] = etag
+        response['Vary'] = 'Accept-Encoding'
+
+        return response
+
+    def as_view(self, fmt):
+        spec = self
+
+        @require_safe
+        def view(request, *args, **kwargs):
+            return spec.serve(request, fmt)
+
+        return view
@@ -0,0 +1,158 @@
+import fnmatch
+import logging
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler, StopUpload
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, UnsupportedMediaType
+
+logger = logging.getLogger(__name__)
+
+#: view attribute holding upload guards by request method
+UPLOAD_GUARDS_ATTR = '_swagger_upload_guards'
+
+#: django request attribute holding installed upload handler
+UPLOAD_HANDLER_ATTR = '_swagger_upload_handler'
+
+class RequestEntityTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Uploaded file is too large.'
+
+# max size and allowed mime types (`image/*` patterns are allowed) of file param
+class SwaggerUploadLimit(object):
+    def __init__(self, name, max_size = None, mime_types = None):
+        self.name = name
+        self.max_size = max_size
+        self.mime_types = list(mime_types) if mime_types else None
+
+    def check_type(self, content_type):
+        if self.mime_types and not any(fnmatch.fnmatch(content_type or '', x) for x in self.mime_types):
+            return UnsupportedMediaType(content_type)
+
+        return None
+
+    def check_size(self, size):
+        if self.max_size is not None and size is not None and size > self.max_size:
+            return RequestEntityTooLarge('File `{}` exceeds {} bytes.'.format(self.name, self.max_size))
+
+        return None
+
+# checks limits while receiving data and always spools accepted files to disk
+class SwaggerUploadHandler(TemporaryFileUploadHandler):
+    def __init__(self, request = None, limits = None):
+        super(SwaggerUploadHandler, self).__init__(request)
+
+        self.limits = limits or {}
+        self.limit = None
+        self.error = None
+        self.received = 0
+
+    def abort(self, error):
+        self.error = error
+
+        # stop reading request body at all
+        raise StopUpload(connection_reset = True)
+
+    def new_file(self, field_name, file_name, content_type, content_length, *args, **kwargs):
+        self.limit = self.limits.get(field_name, None)
+        self.received = 0
+
+        if self.limit:
+            error = self.limit.check_type(content_type) or self.limit.check_size(content_length)
+
+            if error:
+                self.abort(error)
+
+        super(SwaggerUploadHandler, self).new_file(field_name, file_name, content_type, content_length, *args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+
+        if self.limit:
+            error = self.limit.check_size(self.received)
+
+            if error:
+                self.abort(error)
+
+        return super(SwaggerUploadHandler, self).receive_data_chunk(raw_data, start)
+
+# checks uploaded files of operation; handler is installed by view (see upload_view)
+# before DRF authentication, which may parse the body for CSRF check
+class SwaggerUploadGuard(object):
+    def __init__(self, limits):
+        self.limits = { x.name : x for x in limits }
+
+    #: install handler into django request, None if its body was read already
+    def install(self, request):
+        handler = SwaggerUploadHandler(request, self.limits)
+
+        try:
+            request.upload_handlers = [handler]
+        except AttributeError:
+            return None
+
+        setattr(request, UPLOAD_HANDLER_ATTR, handler)
+
+        return handler
+
+    def wrap(self, function):
+        guard = self
+
+        def method(cls, request, *args, **kwargs):
+            handler = getattr(request._request, UPLOAD_HANDLER_ATTR, None) or guard.install(request._request)
+
+            if handler is None:
+                # body was parsed before the view (e.g. by middleware), files are checked afterwards
+                logger.warning('Body of {} {} was read before upload limits were installed, checking files after upload'.format(
+                    request.method, request.path))
+
+            files = request.FILES
+
+            if handler is not None and handler.error is not None:
+                raise handler.error
+
+            for name, limit in guard.limits.items():
+                for f in files.getlist(name):
+                    error = limit.check_type(f.content_type) or limit.check_size(f.size)
+
+                    if error:
+                        raise error
+
+            return function(cls, request, *args, **kwargs)
+
+        return method
+
+#: patch view once: install handler of request method before DRF touches the body
+def upload_view(view, method, guard):
+    guards = view.__dict__.get(UPLOAD_GUARDS_ATTR, None)
+
+    if guards is None:
+        guards = dict()
+        original_initialize = view.initialize_request
+        original_initial = view.initial
+
+        def initialize_request(self, request, *args, **kwargs):
+            current = guards.get(request.method.lower(), None)
+
+            if current is not None:
+                current.install(request)
+
+            return original_initialize(self, request, *args, **kwargs)
+
+        def initial(self, request, *args, **kwargs):
+            try:
+                return original_initial(self, request, *args, **kwargs)
+            except Exception:
+                # aborted upload is the cause of e.g. failed CSRF check on truncated form
+                handler = getattr(request._request, UPLOAD_HANDLER_ATTR, None)
+
+                if handler is not None and handler.error is not None:
+                    raise handler.error
+
+                raise
+
+        setattr(view, UPLOAD_GUARDS_ATTR, guards)
+        setattr(view, 'initialize_request', initialize_request)
+        setattr(view, 'initial', initial)
+
+    guards[method] = guard
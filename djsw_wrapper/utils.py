@@ -1,5 +1,9 @@
 import os
 import re
+import json
+import threading
+
+from collections import OrderedDict
 from jinja2 import Environment, FileSystemLoader
 
 # set(dir(DummyObj)).symmetric_difference(set(dir(self))) == your class attrs
@@ -16,6 +20,48 @@ class _Singleton(type):
 
 class Singleton(_Singleton('SingletonMeta', (object,), {})): pass
 
+class _Multiton(type):
+    """ A metaclass keeping one instance per `name` keyword; first created instance is the default one. """
+    _registry = {}
+    def __call__(cls, *args, **kwargs):
+        instances = cls._registry.setdefault(cls, OrderedDict())
+        name = kwargs.get('name', None)
+
+        if name in instances:
+            return instances[name]
+        if name is None and instances and not args:
+            return next(iter(instances.values()))
+
+        instances[name] = super(_Multiton, cls).__call__(*args, **kwargs)
+        return instances[name]
+
+class Multiton(_Multiton('MultitonMeta', (object,), {})):
+    @classmethod
+    def instances(cls):
+        return list(_Multiton._registry.get(cls, {}).values())
+
+# keeps single copy of equal (json-serializable) values, e.g. across several schemas
+class Interner(object):
+    def __init__(self):
+        self.values = dict()
+        self.lock = threading.Lock()
+
+    def key(self, value):
+        return json.dumps(stringify_keys(value), sort_keys = True, default = str)
+
+    #: get shared object for value, `factory` builds it from value on first use
+    def get(self, value, factory = None):
+        key = self.key(value)
+
+        with self.lock:
+            if key not in self.values:
+                self.values[key] = factory(value) if factory else value
+
+            return self.values[key]
+
+    def __len__(self):
+        return len(self.values)
+
 # TODO: test
 class LazyStorage:
     pass
@@ -52,6 +98,18 @@ class Template():
         template = self.env.get_template(template_name)
         return template.render(**kwargs)
 
+    def source(self, template_name):
+        return self.loader.get_source(self.env, template_name)[0]
+
+#: copy of json-like value with string mapping keys (schemas mix `200` and `default` responses)
+def stringify_keys(value):
+    if isinstance(value, dict):
+        return { str(k) : stringify_keys(v) for k, v in value.items() }
+    elif isinstance(value, (list, tuple)):
+        return [ stringify_keys(x) for x in value ]
+    else:
+        return value
+
 # processes $ref links
 def Resolver(obj, path, full = False):
     m = re.search('#/(.*)/(.*)', path)
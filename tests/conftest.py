@@ -0,0 +1,28 @@
+import os
+
+import django
+from django.conf import settings
+
+#: directory with test schemas
+SCHEMAS = os.path.join(os.path.dirname(__file__), 'schemas')
+
+def pytest_configure():
+    settings.configure(
+        DEBUG = True,
+        SECRET_KEY = 'tests',
+        ROOT_URLCONF = 'tests.urls',
+        ALLOWED_HOSTS = ['*'],
+        # shared between threads of load runner and parallel batches
+        DATABASES = { 'default' : { 'ENGINE' : 'django.db.backends.sqlite3', 'NAME' : 'file:tests?mode=memory&cache=shared' } },
+        INSTALLED_APPS = ['django.contrib.contenttypes', 'django.contrib.auth', 'django.contrib.sessions', 'rest_framework', 'djsw_wrapper', 'tests'],
+        MIDDLEWARE = ['django.contrib.sessions.middleware.SessionMiddleware', 'django.middleware.csrf.CsrfViewMiddleware',
+                      'django.contrib.auth.middleware.AuthenticationMiddleware'],
+        REST_FRAMEWORK = { 'DEFAULT_AUTHENTICATION_CLASSES' : [], 'DEFAULT_PERMISSION_CLASSES' : [] },
+        SWAGGER_SCHEMA = os.path.join(SCHEMAS, 'petstore.yaml'),
+        SWAGGER_MODULE = 'tests.controllers'
+    )
+
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb = True, verbosity = 0)
@@ -0,0 +1,95 @@
+import threading
+
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
+from django.utils.timezone import utc
+
+from rest_framework import serializers, viewsets
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.authentication import SessionAuthentication
+
+from tests.models import Owner, Pet
+
+class OwnerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Owner
+        fields = ('id', 'name')
+
+class PetSerializer(serializers.ModelSerializer):
+    owner = OwnerSerializer()
+
+    class Meta:
+        model = Pet
+        fields = ('id', 'name', 'owner')
+
+class PetViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Pet.objects.all()
+    serializer_class = PetSerializer
+
+class OwnerViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Owner.objects.all()
+    serializer_class = OwnerSerializer
+
+class NoteView(APIView):
+    #: requests which reached the controller
+    calls = []
+
+    def get(self, request, *args, **kwargs):
+        self.calls.append(request.method)
+        return Response({ 'user' : request.user.pk, 'calls' : len(self.calls) })
+
+    def post(self, request, *args, **kwargs):
+        self.calls.append(request.method)
+        return Response(status = 201)
+
+    def put(self, request, *args, **kwargs):
+        self.calls.append(request.method)
+        return Response({})
+
+    def delete(self, request, *args, **kwargs):
+        self.calls.append(request.method)
+        return Response(status = 204)
+
+class TagView(APIView):
+    #: requests which reached the handler
+    calls = []
+
+    #: validators returned to conditional layer
+    version = '1'
+    modified = datetime(2020, 1, 1, tzinfo = utc)
+
+    def get(self, request, *args, **kwargs):
+        self.calls.append(request.method)
+        return Response({ 'version' : self.version })
+
+    def get_etag(self, request, *args, **kwargs):
+        return self.version
+
+    def get_modified(self, request, *args, **kwargs):
+        return self.modified
+
+class SlowView(APIView):
+    #: set when a request enters the handler
+    entered = threading.Event()
+
+    #: handler blocks until it is set
+    gate = threading.Event()
+
+    def get(self, request, *args, **kwargs):
+        self.entered.set()
+        self.gate.wait(5)
+
+        return Response({})
+
+class PhotoView(APIView):
+    authentication_classes = (SessionAuthentication,)
+    permission_classes = ()
+
+    def post(self, request, *args, **kwargs):
+        return Response({ 'size' : request.FILES['photo'].size })
+
+class ExportView(APIView):
+    def get(self, request, *args, **kwargs):
+        return StreamingHttpResponse(iter([b'id,name\n', b'1,Rex\n']), content_type = 'text/csv')
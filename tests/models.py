@@ -0,0 +1,10 @@
+from django.db import models
+
+class Owner(models.Model):
+    name = models.CharField(max_length = 64)
+    address = models.TextField(default = '')
+
+class Pet(models.Model):
+    name = models.CharField(max_length = 64)
+    notes = models.TextField(default = '')
+    owner = models.ForeignKey(Owner, on_delete = models.CASCADE, related_name = 'pets')
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from rest_framework import serializers
+
+from djsw_wrapper.params import SwaggerParameter
+
+#: size of benchmarked arrays
+ITEMS = 10000
+
+def make_param(**kwargs):
+    schema = { 'name' : 'ids', 'in' : 'query', 'type' : 'array', 'items' : { 'type' : 'integer' } }
+    schema.update(kwargs)
+
+    return SwaggerParameter(schema)
+
+def measure(function, repeat = 5):
+    best = None
+
+    for x in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def test_collection_formats():
+    for fmt, value in [('csv', '1,2,3'), ('ssv', '1 2 3'), ('tsv', '1\t2\t3'), ('pipes', '1|2|3'), ('multi', ['1', '2', '3'])]:
+        param = make_param(collectionFormat = fmt)
+
+        assert param.as_field().run_validation(param.split(value)) == [1, 2, 3]
+
+def test_integer_items_are_strict():
+    field = make_param(**{ 'in' : 'body' }).as_field()
+
+    assert field.run_validation([1, '2', 3.0, '4.0']) == [1, 2, 3, 4]
+
+    for wrong in [1.5, True, '1.5', 'x']:
+        with pytest.raises(serializers.ValidationError):
+            field.run_validation([1, wrong])
+
+def test_limits_are_checked_before_items():
+    field = make_param(maxItems = 3).as_field()
+
+    with pytest.raises(serializers.ValidationError) as error:
+        field.run_validation(['x'] * 4)
+
+    assert 'no more than 3' in str(error.value)
+
+def make_benchmark():
+    param = make_param(maxItems = ITEMS, uniqueItems = True, items = { 'type' : 'integer', 'minimum' : 0 })
+    raw = ','.join(str(x) for x in range(ITEMS))
+
+    return param, param.as_field(), raw
+
+def test_bulk_validation_of_10k_items():
+    param, field, raw = make_benchmark()
+
+    assert field.run_validation(param.split(raw)) == list(range(ITEMS))
+
+    with pytest.raises(serializers.ValidationError):
+        field.run_validation(param.split(raw + ',1'))
+
+    print('\n{} items: {:.1f} ms'.format(ITEMS, measure(lambda: field.run_validation(param.split(raw))) * 1000))
+
+@pytest.mark.benchmark
+def test_bulk_validation_is_faster_than_list_field():
+    param, field, raw = make_benchmark()
+
+    # DRF baseline: full field validation per item
+    baseline = serializers.ListField(child = serializers.IntegerField(min_value = 0))
+
+    bulk = measure(lambda: field.run_validation(param.split(raw)))
+    plain = measure(lambda: baseline.run_validation(raw.split(',')))
+
+    print('\n{} items: bulk {:.1f} ms, ListField {:.1f} ms'.format(ITEMS, bulk * 1000, plain * 1000))
+
+    assert bulk < plain
@@ -0,0 +1,53 @@
+import os
+import json
+
+from django.test import RequestFactory, override_settings
+
+from djsw_wrapper.core import Swagger
+
+from tests.conftest import SCHEMAS
+from tests.models import Owner, Pet
+
+def test_batch_results():
+    with override_settings(SWAGGER_BATCH = True):
+        router = Swagger(os.path.join(SCHEMAS, 'petstore.yaml'), 'tests.controllers', name = 'batch').router
+
+    owner = Owner.objects.create(name = 'Ann')
+    pet = Pet.objects.create(name = 'Rex', owner = owner)
+
+    payload = [{ 'method' : 'get', 'path' : '/api/pets/{}'.format(pet.id) },
+               { 'method' : 'get', 'path' : '/api/export' },
+               { 'method' : 'get', 'path' : '/api/missing' }]
+
+    request = RequestFactory().post('/api/batch', json.dumps(payload), content_type = 'application/json')
+    response = router.get_batch_apiview()(request)
+    response.render()
+
+    single, export, missing = json.loads(response.content.decode('utf-8'))
+
+    assert single['status'] == 200
+    assert single['headers']['Content-Type'] == 'application/json'
+    assert single['body'] == { 'id' : pet.id, 'name' : 'Rex', 'owner' : { 'id' : owner.id, 'name' : 'Ann' } }
+
+    assert export['status'] == 200
+    assert export['headers']['Content-Type'] == 'text/csv'
+    assert export['body'] is None
+
+    assert missing['status'] == 404
+
+    pet.delete()
+    owner.delete()
+
+def test_malformed_items_are_rejected_one_by_one():
+    with override_settings(SWAGGER_BATCH = True):
+        router = Swagger(os.path.join(SCHEMAS, 'petstore.yaml'), 'tests.controllers', name = 'batch-malformed').router
+
+    payload = [{ 'method' : 'get', 'path' : 5 }, { 'method' : 'trace', 'path' : '/api/pets' }, { 'path' : '/api/pets' },
+               { 'method' : 'get', 'path' : '/api/pets', 'query' : 'ids=1' }, 'get /api/pets',
+               { 'method' : 'GET', 'path' : '/api/pets' }]
+
+    request = RequestFactory().post('/api/batch', json.dumps(payload), content_type = 'application/json')
+    response = router.get_batch_apiview()(request)
+
+    assert response.status_code == 200
+    assert [ x['status'] for x in response.data ] == [400, 400, 400, 400, 400, 200]
@@ -0,0 +1,96 @@
+import os
+import re
+import yaml
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from djsw_wrapper import cache
+from djsw_wrapper.core import Swagger
+
+from tests.conftest import SCHEMAS
+from tests.controllers import NoteView
+
+def mount(tmpdir, name, **options):
+    with open(os.path.join(SCHEMAS, 'petstore.yaml')) as f:
+        schema = yaml.safe_load(f)
+
+    response = { 'responses' : { 200 : { 'description' : 'Ok' }, 'default' : { 'description' : 'Error' } } }
+
+    schema['basePath'] = '/' + name
+    schema['paths'] = { '/notes' : {
+        'x-swagger-router-view' : 'NoteView',
+        'get' : dict(response, **{ 'x-swagger-cache' : dict({ 'ttl' : 60 }, **options) }),
+        'post' : dict(response),
+        'put' : dict(response),
+        'delete' : dict(response)
+    } }
+
+    path = str(tmpdir.join(name + '.yaml'))
+
+    with open(path, 'w') as f:
+        yaml.safe_dump(schema, f)
+
+    return Swagger(path, 'tests.controllers', name = name).router
+
+def call(router, method, path, user = None):
+    request = getattr(APIRequestFactory(), method)(path)
+
+    if user is not None:
+        force_authenticate(request, user)
+
+    for regex, data in router.handlers.items():
+        if re.match(regex, path.lstrip('/')):
+            response = data['view'](request)
+            return response.status_code, response.data
+
+def test_lru_cache_evicts_old_and_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+
+    store = cache.SwaggerLRUCache(size = 2)
+    store.set('a', 1, 10)
+    store.set('b', 2)
+
+    # touching `a` makes `b` the least recently used one
+    assert store.get('a') == 1
+    store.set('c', 3)
+
+    assert store.get('b') is None
+    assert store.get('c') == 3
+
+    now[0] += 11
+
+    assert store.get('a') is None
+    assert store.get('c') == 3
+
+def test_cached_responses_are_reused_per_user(tmpdir):
+    router = mount(tmpdir, 'cache-users')
+    ann = User.objects.create(username = 'ann')
+    bob = User.objects.create(username = 'bob')
+    del NoteView.calls[:]
+
+    try:
+        anonymous = call(router, 'get', '/cache-users/notes')
+
+        assert call(router, 'get', '/cache-users/notes') == anonymous
+        assert call(router, 'get', '/cache-users/notes', ann) == (200, { 'user' : ann.pk, 'calls' : 2 })
+        assert call(router, 'get', '/cache-users/notes', bob) == (200, { 'user' : bob.pk, 'calls' : 3 })
+        assert call(router, 'get', '/cache-users/notes', ann) == (200, { 'user' : ann.pk, 'calls' : 2 })
+        assert NoteView.calls == ['GET'] * 3
+    finally:
+        ann.delete()
+        bob.delete()
+
+def test_mutations_invalidate_cached_responses(tmpdir):
+    router = mount(tmpdir, 'cache-mutations')
+    del NoteView.calls[:]
+
+    for method, code in [('post', 201), ('put', 200), ('delete', 204)]:
+        before = call(router, 'get', '/cache-mutations/notes')
+
+        assert call(router, 'get', '/cache-mutations/notes') == before
+        assert call(router, method, '/cache-mutations/notes')[0] == code
+        assert call(router, 'get', '/cache-mutations/notes')[1]['calls'] == before[1]['calls'] + 2
+
+    assert NoteView.calls == ['GET', 'POST', 'GET', 'PUT', 'GET', 'DELETE', 'GET']
@@ -0,0 +1,103 @@
+import os
+import re
+import yaml
+import pytest
+
+from datetime import timedelta
+
+from django.utils.http import http_date
+from rest_framework.test import APIRequestFactory
+
+from djsw_wrapper.core import Swagger
+from djsw_wrapper.errors import SwaggerValidationError
+
+from tests.conftest import SCHEMAS
+from tests.controllers import TagView
+
+def mount(tmpdir, name, view, options):
+    with open(os.path.join(SCHEMAS, 'petstore.yaml')) as f:
+        schema = yaml.safe_load(f)
+
+    schema['basePath'] = '/' + name
+    schema['paths'] = { '/tags' : {
+        'x-swagger-router-view' : view,
+        'x-swagger-etag' : options,
+        'get' : { 'responses' : { 200 : { 'description' : 'Ok' }, 'default' : { 'description' : 'Error' } } }
+    } }
+
+    path = str(tmpdir.join(name + '.yaml'))
+
+    with open(path, 'w') as f:
+        yaml.safe_dump(schema, f)
+
+    router = Swagger(path, 'tests.controllers', name = name).router
+
+    def call(**headers):
+        for regex, data in router.handlers.items():
+            if re.match(regex, name + '/tags'):
+                return data['view'](APIRequestFactory().get('/{}/tags'.format(name), **headers))
+
+    return call
+
+def test_computed_etag(tmpdir):
+    call = mount(tmpdir, 'etag-computed', 'TagView', True)
+    del TagView.calls[:]
+
+    first = call()
+    etag = first['ETag']
+
+    assert first.status_code == 200
+    assert call(HTTP_IF_NONE_MATCH = etag).status_code == 304
+    assert call(HTTP_IF_NONE_MATCH = '"other"').status_code == 200
+
+    # rendered content is hashed, so the handler runs every time
+    assert len(TagView.calls) == 3
+
+def test_controller_validators_skip_the_handler(tmpdir):
+    call = mount(tmpdir, 'etag-named', 'TagView', { 'etag' : 'get_etag', 'last_modified' : 'get_modified' })
+    del TagView.calls[:]
+
+    first = call()
+
+    assert first.status_code == 200
+    assert first['ETag'] == '"1"'
+    assert first['Last-Modified'] == http_date(1577836800)
+
+    assert call(HTTP_IF_NONE_MATCH = '"1"').status_code == 304
+    assert TagView.calls == ['GET']
+
+    TagView.version = '2'
+
+    try:
+        assert call(HTTP_IF_NONE_MATCH = '"1"').status_code == 200
+        assert TagView.calls == ['GET', 'GET']
+    finally:
+        TagView.version = '1'
+
+def test_if_modified_since(tmpdir):
+    call = mount(tmpdir, 'etag-modified', 'TagView', { 'last_modified' : 'get_modified' })
+    del TagView.calls[:]
+
+    modified = TagView.modified
+
+    assert call(HTTP_IF_MODIFIED_SINCE = http_date(1577836800)).status_code == 304
+    assert call(HTTP_IF_MODIFIED_SINCE = http_date(1577836800 + 60)).status_code == 304
+    assert call(HTTP_IF_MODIFIED_SINCE = http_date(1577836800 - 60)).status_code == 200
+    assert TagView.calls == ['GET']
+
+    TagView.modified = modified + timedelta(days = 1)
+
+    try:
+        assert call(HTTP_IF_MODIFIED_SINCE = http_date(1577836800)).status_code == 200
+    finally:
+        TagView.modified = modified
+
+def test_missing_methods(tmpdir):
+    with pytest.raises(SwaggerValidationError):
+        mount(tmpdir, 'etag-missing', 'TagView', { 'etag' : 'get_missing' })
+
+    # stub handler has nothing to ask, its payload is hashed
+    call = mount(tmpdir, 'etag-stub', 'MissingView', { 'etag' : 'get_missing' })
+    etag = call()['ETag']
+
+    assert call(HTTP_IF_NONE_MATCH = etag).status_code == 304
@@ -0,0 +1,124 @@
+import os
+import yaml
+import threading
+
+import pytest
+
+from django.utils.six.moves.BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from django.test import override_settings
+
+from djsw_wrapper.core import Swagger
+from djsw_wrapper.fetch import SwaggerSchemaFetcher
+from djsw_wrapper.errors import SwaggerGenericError
+
+ROOT = {
+    'swagger' : '2.0',
+    'info' : { 'title' : 'Remote', 'version' : '1.0' },
+    'basePath' : '/remote',
+    'paths' : {
+        '/owners' : {
+            'get' : {
+                'responses' : {
+                    200 : { 'description' : 'Owners', 'schema' : { 'type' : 'array', 'items' : { '$ref' : 'common.yaml#/definitions/Owner' } } },
+                    'default' : { 'description' : 'Error' }
+                }
+            }
+        }
+    }
+}
+
+COMMON = { 'definitions' : { 'Owner' : { 'type' : 'object', 'properties' : { 'id' : { 'type' : 'integer' }, 'name' : { 'type' : 'string' } } } } }
+
+# stand-in origin answering conditional requests
+class Origin(HTTPServer):
+    documents = { '/swagger.yaml' : ROOT, '/common.yaml' : COMMON }
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), OriginHandler)
+        self.log = []
+
+    def url(self, path):
+        return 'http://127.0.0.1:{}{}'.format(self.server_port, path)
+
+class OriginHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        document = self.server.documents.get(self.path, None)
+        etag = '"{}"'.format(len(self.path))
+        conditional = self.headers.get('If-None-Match', None) == etag
+
+        self.server.log.append((self.path, conditional))
+
+        if document is None:
+            self.send_response(404)
+            body = b''
+        elif conditional:
+            self.send_response(304)
+            body = b''
+        else:
+            self.send_response(200)
+            body = yaml.safe_dump(document).encode('utf-8')
+
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def origin():
+    server = Origin()
+    thread = threading.Thread(target = server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+def test_fresh_revalidated_and_offline(origin, tmpdir):
+    directory = str(tmpdir.join('cache'))
+    url = origin.url('/swagger.yaml')
+
+    schema = SwaggerSchemaFetcher(directory).load(url)
+
+    assert sorted(origin.log) == [('/common.yaml', False), ('/swagger.yaml', False)]
+    assert schema['definitions']['Owner'] == COMMON['definitions']['Owner']
+    assert schema['paths']['/owners']['get']['responses'][200]['schema']['items']['$ref'] == '#/definitions/Owner'
+    assert oct(os.stat(directory).st_mode & 0o777) == oct(0o700)
+
+    # revalidated with conditional requests
+    del origin.log[:]
+
+    assert SwaggerSchemaFetcher(directory).load(url) == schema
+    assert sorted(origin.log) == [('/common.yaml', True), ('/swagger.yaml', True)]
+
+    # origin is gone
+    origin.shutdown()
+    origin.server_close()
+
+    assert SwaggerSchemaFetcher(directory, timeout = 1).load(url) == schema
+
+def test_shared_cache_directory_is_not_trusted(origin, tmpdir):
+    directory = str(tmpdir.join('cache'))
+    url = origin.url('/swagger.yaml')
+
+    SwaggerSchemaFetcher(directory).load(url)
+    os.chmod(directory, 0o777)
+
+    origin.shutdown()
+    origin.server_close()
+
+    with pytest.raises(SwaggerGenericError):
+        SwaggerSchemaFetcher(directory, timeout = 1).load(url)
+
+def test_remote_schema_is_routed(origin, tmpdir):
+    with override_settings(SWAGGER_SCHEMA_CACHE = str(tmpdir.join('cache'))):
+        swagger = Swagger(origin.url('/swagger.yaml'), 'tests.missing', name = 'remote')
+
+    assert 'Owner' in swagger.get_models()
+    assert swagger.router.base == '/remote'
@@ -0,0 +1,123 @@
+import os
+import re
+import time
+import yaml
+import pytest
+
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from djsw_wrapper.core import Swagger
+
+from tests.conftest import SCHEMAS
+from tests.models import Owner, Pet
+
+#: size of serialized list
+PETS = 200
+
+@pytest.fixture(scope = 'module')
+def sparse(tmpdir_factory):
+    with open(os.path.join(SCHEMAS, 'petstore.yaml')) as f:
+        schema = yaml.safe_load(f)
+
+    schema['basePath'] = '/sparse'
+    schema['paths'] = { path : schema['paths'][path] for path in ('/pets', '/pets/{id}') }
+
+    for part in schema['paths'].values():
+        part['get']['x-swagger-fields'] = True
+
+    path = str(tmpdir_factory.mktemp('sparse').join('sparse.yaml'))
+
+    with open(path, 'w') as f:
+        yaml.safe_dump(schema, f)
+
+    router = Swagger(path, 'tests.controllers', name = 'sparse').router
+
+    def call(path, **query):
+        for regex, data in router.handlers.items():
+            match = re.match(regex, path.lstrip('/'))
+
+            if match:
+                response = data['view'](RequestFactory().get(path, query), **match.groupdict())
+                response.render()
+
+                return response
+
+    owners = [ Owner.objects.create(name = 'owner{}'.format(x), address = 'street{}'.format(x)) for x in range(PETS) ]
+    Pet.objects.bulk_create([ Pet(name = 'pet{}'.format(x), notes = 'notes', owner = owners[x]) for x in range(PETS) ])
+
+    yield call
+
+    Pet.objects.all().delete()
+    Owner.objects.all().delete()
+
+def test_list_and_retrieve_are_trimmed(sparse):
+    pet = Pet.objects.select_related('owner').first()
+
+    response = sparse('/sparse/pets', fields = 'id,owner')
+
+    assert response.status_code == 200
+    assert response.data[0] == { 'id' : pet.id, 'owner' : { 'id' : pet.owner.id, 'name' : pet.owner.name } }
+
+    response = sparse('/sparse/pets/{}'.format(pet.id), fields = 'name')
+
+    assert response.status_code == 200
+    assert response.data == { 'name' : pet.name }
+
+    # without `fields` whole definition is rendered
+    assert set(sparse('/sparse/pets/{}'.format(pet.id)).data) == set(['id', 'name', 'owner'])
+
+def test_unknown_field_is_rejected(sparse):
+    assert sparse('/sparse/pets', fields = 'id,notes').status_code == 400
+    assert sparse('/sparse/pets/1', fields = 'owner__address').status_code == 400
+
+def test_requested_fields_narrow_columns(sparse):
+    with CaptureQueriesContext(connection) as queries:
+        assert sparse('/sparse/pets', fields = 'id').status_code == 200
+
+    sql = queries[0]['sql']
+
+    assert len(queries) == 1
+    assert 'JOIN' not in sql
+    assert '"tests_pet"."name"' not in sql and '"tests_pet"."notes"' not in sql
+
+    with CaptureQueriesContext(connection) as queries:
+        assert sparse('/sparse/pets', fields = 'name,owner').status_code == 200
+
+    sql = queries[0]['sql']
+
+    assert len(queries) == 1
+    assert 'JOIN' in sql and '"tests_pet"."name"' in sql
+    assert '"notes"' not in sql and '"address"' not in sql
+
+def measure(function, repeat = 5):
+    best = None
+
+    for x in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def test_fewer_fields_mean_smaller_payload(sparse):
+    full = sparse('/sparse/pets')
+    narrow = sparse('/sparse/pets', fields = 'id')
+
+    assert len(narrow.data) == len(full.data) == PETS
+    assert len(narrow.content) * 4 < len(full.content)
+
+    print('\n{} pets: full {:.1f} ms / {} bytes, id only {:.1f} ms / {} bytes'.format(PETS,
+        measure(lambda: sparse('/sparse/pets')) * 1000, len(full.content),
+        measure(lambda: sparse('/sparse/pets', fields = 'id')) * 1000, len(narrow.content)))
+
+@pytest.mark.benchmark
+def test_fewer_fields_are_faster_to_serialize(sparse):
+    full = measure(lambda: sparse('/sparse/pets'))
+    narrow = measure(lambda: sparse('/sparse/pets', fields = 'id'))
+
+    print('\n{} pets: full {:.1f} ms, id only {:.1f} ms'.format(PETS, full * 1000, narrow * 1000))
+
+    assert narrow < full
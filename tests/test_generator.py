@@ -0,0 +1,80 @@
+import os
+import sys
+import yaml
+import importlib
+
+from djsw_wrapper.core import Swagger
+from djsw_wrapper.generator import SwaggerGenerator
+
+from tests.conftest import SCHEMAS
+
+def describe(tmpdir, name, change = None):
+    with open(os.path.join(SCHEMAS, 'petstore.yaml')) as f:
+        schema = yaml.safe_load(f)
+
+    # controllers are described by view name, keep list one apart from detail one
+    schema['paths']['/pets']['x-swagger-router-view'] = 'PetList'
+
+    if change:
+        change(schema)
+
+    path = str(tmpdir.join(name + '.yaml'))
+
+    with open(path, 'w') as f:
+        yaml.safe_dump(schema, f)
+
+    router = Swagger(path, 'tests.controllers', name = name).router
+    router.update(True)
+    router.process()
+
+    return router.enum
+
+def test_generate_and_skip_unchanged(tmpdir):
+    directory = str(tmpdir.join('views'))
+    generator = SwaggerGenerator(directory)
+
+    generated, skipped, removed = generator.run(describe(tmpdir, 'gen-first'))
+
+    assert 'pets.py' in generated and not skipped and not removed
+
+    with open(os.path.join(directory, 'pets.py')) as f:
+        assert 'class PetList(APIView)' in f.read()
+
+    generated, skipped, removed = generator.run(describe(tmpdir, 'gen-second'))
+
+    assert not generated and 'pets.py' in skipped
+
+def test_definition_change_regenerates_module(tmpdir):
+    directory = str(tmpdir.join('views'))
+    generator = SwaggerGenerator(directory)
+
+    generator.run(describe(tmpdir, 'gen-before'))
+
+    def add_property(schema):
+        schema['definitions']['Pet']['properties']['age'] = { 'type' : 'integer' }
+
+    generated, skipped, removed = generator.run(describe(tmpdir, 'gen-after', add_property))
+
+    assert generated == ['pets.py']
+
+    with open(os.path.join(directory, 'pets.py')) as f:
+        assert "'age'" in f.read()
+
+def test_paginated_model_is_plain_python(tmpdir):
+    directory = str(tmpdir.join('paginated'))
+
+    def paginate(schema):
+        schema['paths']['/pets']['get']['x-swagger-pagination'] = { 'type' : 'keyset' }
+
+    SwaggerGenerator(directory).run(describe(tmpdir, 'gen-paginated', paginate))
+
+    sys.path.insert(0, str(tmpdir))
+
+    try:
+        module = importlib.import_module('paginated.pets')
+    finally:
+        sys.path.remove(str(tmpdir))
+
+    response = module.PetList().get(None)
+
+    assert response.data == { 'next' : None, 'results' : [{ 'id' : None, 'name' : None, 'owner' : None }] }
@@ -0,0 +1,100 @@
+import os
+import re
+import time
+import yaml
+import threading
+
+from rest_framework.test import APIRequestFactory
+
+from djsw_wrapper.core import Swagger
+
+from tests.conftest import SCHEMAS
+from tests.controllers import SlowView
+
+def mount(tmpdir, name, options):
+    with open(os.path.join(SCHEMAS, 'petstore.yaml')) as f:
+        schema = yaml.safe_load(f)
+
+    schema['basePath'] = '/' + name
+    schema['paths'] = { '/slow' : {
+        'x-swagger-router-view' : 'SlowView',
+        'get' : { 'x-swagger-concurrency' : options,
+                  'responses' : { 200 : { 'description' : 'Ok' }, 'default' : { 'description' : 'Error' } } }
+    } }
+
+    path = str(tmpdir.join(name + '.yaml'))
+
+    with open(path, 'w') as f:
+        yaml.safe_dump(schema, f)
+
+    return Swagger(path, 'tests.controllers', name = name).router
+
+def wait_for(condition):
+    deadline = time.time() + 5
+
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.005)
+
+def test_requests_are_queued_timed_out_and_shed(tmpdir):
+    router = mount(tmpdir, 'limits', { 'max' : 1, 'queue' : 1, 'timeout_ms' : 200, 'retry_after' : 3 })
+    view = [ data['view'] for regex, data in router.handlers.items() if re.match(regex, 'limits/slow') ][0]
+
+    stats = lambda: router.limits_stats['GET /limits/slow']
+    results = []
+
+    def call():
+        response = view(APIRequestFactory().get('/limits/slow'))
+        results.append(response)
+
+        return response
+
+    def start():
+        thread = threading.Thread(target = call)
+        thread.start()
+
+        return thread
+
+    SlowView.gate.clear()
+    SlowView.entered.clear()
+
+    try:
+        # first request holds the only slot, second one waits in the queue
+        running = start()
+        SlowView.entered.wait(5)
+        queued = start()
+        wait_for(lambda: stats()['waiting'] == 1)
+
+        assert stats() == { 'max' : 1, 'queue' : 1, 'inflight' : 1, 'waiting' : 1, 'shed' : 0 }
+
+        # queue is full: shed at once
+        shed = call()
+
+        assert shed.status_code == 503
+        assert shed['Retry-After'] == '3'
+        assert stats()['shed'] == 1
+
+        SlowView.gate.set()
+        running.join()
+        queued.join()
+
+        assert [ x.status_code for x in results ] == [503, 200, 200]
+
+        # queued request gives up after timeout_ms
+        SlowView.gate.clear()
+        SlowView.entered.clear()
+
+        running = start()
+        SlowView.entered.wait(5)
+
+        started = time.time()
+        timed_out = call()
+
+        assert timed_out.status_code == 503
+        assert time.time() - started >= 0.15
+        assert stats()['shed'] == 2
+    finally:
+        SlowView.gate.set()
+        running.join()
+
+    assert stats() == { 'max' : 1, 'queue' : 1, 'inflight' : 0, 'waiting' : 0, 'shed' : 2 }
@@ -0,0 +1,73 @@
+from djsw_wrapper.loadtest import SwaggerRequestFactory, SwaggerLoadRunner, SwaggerFileSample, summarize
+
+from tests.models import Owner, Pet
+
+def operation(factory, name):
+    return [ (kind, request) for op, kind, request in factory.generate() if op == name ]
+
+def test_valid_requests_pass_gate():
+    from django.apps import apps
+
+    factory = SwaggerRequestFactory(apps.get_app_config('djsw_wrapper').swagger.get_schema(), seed = 1)
+    owner = Owner.objects.create(name = 'Ann')
+    Pet.objects.create(name = 'Rex', owner = owner)
+
+    try:
+        results, elapsed = SwaggerLoadRunner().run(list(factory.generate()), concurrency = 1)
+    finally:
+        Pet.objects.all().delete()
+        Owner.objects.all().delete()
+
+    stats = summarize(results, elapsed)
+
+    for name, entry in stats.items():
+        assert entry['error_rate'] == 0, name
+
+    # uploads of valid size and type are accepted, oversized and wrong typed ones are not
+    codes = [ (kind, code) for name, kind, code, latency in results if name == 'POST /api/photos/{id}' ]
+
+    assert ('valid', 200) in codes and ('boundary', 200) in codes
+    assert ('invalid', 413) in codes
+
+def test_unexpected_rejections_count_as_errors():
+    results = [('GET /api/pets', 'valid', 400, 0.1), ('GET /api/pets', 'boundary', 200, 0.1),
+               ('GET /api/pets/{id}', 'valid', 404, 0.1), ('GET /api/pets/{id}', 'invalid', 400, 0.1)]
+
+    stats = summarize(results, 1.0)
+
+    assert stats['GET /api/pets']['unexpected'] == 1
+    assert stats['GET /api/pets']['error_rate'] == 0.5
+    assert stats['GET /api/pets/{id}']['rejected'] == 2
+    assert stats['GET /api/pets/{id}']['error_rate'] == 0
+
+def test_injected_and_file_params():
+    schema = {
+        'basePath' : '/api',
+        'paths' : {
+            '/pets' : {
+                'get' : { 'x-swagger-pagination' : { 'type' : 'keyset', 'max_page' : 10 }, 'x-swagger-fields' : True,
+                          'responses' : { 200 : { 'schema' : { 'type' : 'array', 'items' : { '$ref' : '#/definitions/Pet' } } } } },
+                'post' : { 'parameters' : [{ 'name' : 'photo', 'in' : 'formData', 'type' : 'file',
+                                             'x-swagger-max-size' : 8, 'x-swagger-mime-types' : ['image/*'] }] }
+            }
+        },
+        'definitions' : { 'Pet' : { 'properties' : { 'id' : { 'type' : 'integer' }, 'name' : { 'type' : 'string' } } } }
+    }
+
+    factory = SwaggerRequestFactory(schema, seed = 1)
+    listing = dict(operation(factory, 'GET /api/pets'))
+
+    assert set(listing['valid']['query']) == set(['cursor', 'limit', 'fields'])
+    assert set(listing['valid']['query']['fields'].split(',')) <= set(['id', 'name'])
+    assert 1 <= listing['boundary']['query']['limit'] <= 10
+
+    uploads = operation(factory, 'POST /api/pets')
+    files = [ (kind, request['form']['photo']) for kind, request in uploads ]
+
+    for kind, f in files:
+        assert isinstance(f, SwaggerFileSample)
+
+        if kind == 'invalid':
+            assert len(f.content) > 8
+        else:
+            assert len(f.content) <= 8 and f.content_type.startswith('image/')
@@ -0,0 +1,49 @@
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from tests.models import Owner
+
+def test_keyset_pages():
+    ids = [ Owner.objects.create(name = 'owner{}'.format(x)).id for x in range(5) ]
+    client = Client()
+    seen = []
+    cursor = None
+
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            while True:
+                response = client.get('/api/owners', { 'cursor' : cursor } if cursor else {})
+
+                assert response.status_code == 200
+                assert len(response.data['results']) <= 2
+
+                seen.extend([ x['id'] for x in response.data['results'] ])
+                cursor = response.data['next']
+
+                if cursor is None:
+                    break
+
+                # next cursor is the last key of the page
+                assert cursor == seen[-1]
+
+        assert seen == ids
+        assert len(queries) == 3
+
+        for query in queries:
+            sql = query['sql'].upper()
+
+            assert 'OFFSET' not in sql
+            assert 'LIMIT 3' in sql
+
+        assert '"ID" > {}'.format(ids[1]) in queries[1]['sql'].upper()
+    finally:
+        Owner.objects.all().delete()
+
+def test_injected_params_are_validated():
+    client = Client()
+
+    assert client.get('/api/owners', { 'limit' : 3 }).status_code == 200
+    assert client.get('/api/owners', { 'limit' : 4 }).status_code == 400
+    assert client.get('/api/owners', { 'limit' : 0 }).status_code == 400
+    assert client.get('/api/owners', { 'cursor' : 'abc' }).status_code == 400
@@ -0,0 +1,80 @@
+import os
+import re
+import yaml
+
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from djsw_wrapper.core import Swagger
+
+from tests.conftest import SCHEMAS
+from tests.models import Owner, Pet
+from tests.controllers import PetSerializer
+
+#: size of benchmarked list
+PETS = 20
+
+def test_nested_list_query_count():
+    owners = [ Owner.objects.create(name = 'owner{}'.format(x)) for x in range(PETS) ]
+    Pet.objects.bulk_create([ Pet(name = 'pet{}'.format(x), owner = owners[x]) for x in range(PETS) ])
+
+    try:
+        # plain serializer: one query for pets and one per nested owner
+        with CaptureQueriesContext(connection) as plain:
+            PetSerializer(Pet.objects.all(), many = True).data
+
+        # x-swagger-optimize: pets joined with owners, unused columns are not loaded
+        with CaptureQueriesContext(connection) as optimized:
+            response = Client().get('/api/pets')
+
+        assert response.status_code == 200
+        assert len(response.data) == PETS
+        assert response.data[0]['owner']['name'] == 'owner0'
+
+        assert len(plain) == PETS + 1
+        assert len(optimized) == 1
+
+        sql = optimized[0]['sql']
+
+        assert 'JOIN' in sql
+        assert '"notes"' not in sql and '"address"' not in sql
+    finally:
+        Pet.objects.all().delete()
+        Owner.objects.all().delete()
+
+def test_serializer_fields_outside_definition_disable_only(tmpdir):
+    with open(os.path.join(SCHEMAS, 'petstore.yaml')) as f:
+        schema = yaml.safe_load(f)
+
+    # serializer still renders `name` of pets and owners
+    schema['basePath'] = '/narrow'
+    del schema['definitions']['Pet']['properties']['name']
+    del schema['definitions']['Owner']['properties']['name']
+
+    path = str(tmpdir.join('narrow.yaml'))
+
+    with open(path, 'w') as f:
+        yaml.safe_dump(schema, f)
+
+    router = Swagger(path, 'tests.controllers', name = 'narrow').router
+    view = [ data['view'] for regex, data in router.handlers.items() if re.match(regex, 'narrow/pets') ][0]
+
+    owners = [ Owner.objects.create(name = 'owner{}'.format(x)) for x in range(PETS) ]
+    Pet.objects.bulk_create([ Pet(name = 'pet{}'.format(x), owner = owners[x]) for x in range(PETS) ])
+
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            response = view(RequestFactory().get('/narrow/pets'))
+
+        assert response.status_code == 200
+        assert response.data[0]['name'] == 'pet0'
+        assert response.data[0]['owner']['name'] == 'owner0'
+
+        # still joined, but all columns are loaded
+        assert len(queries) == 1
+        assert 'JOIN' in queries[0]['sql']
+        assert '"notes"' in queries[0]['sql']
+    finally:
+        Pet.objects.all().delete()
+        Owner.objects.all().delete()
@@ -0,0 +1,44 @@
+import os
+import re
+import yaml
+
+from django.test import RequestFactory
+
+from djsw_wrapper.core import Swagger
+
+from tests.conftest import SCHEMAS
+from tests.controllers import PetViewSet
+
+def mount(tmpdir, name, base, max_ids):
+    with open(os.path.join(SCHEMAS, 'petstore.yaml')) as f:
+        schema = yaml.safe_load(f)
+
+    schema['basePath'] = base
+    schema['paths']['/pets']['get']['parameters'][0]['maxItems'] = max_ids
+
+    path = str(tmpdir.join(name + '.yaml'))
+
+    with open(path, 'w') as f:
+        yaml.safe_dump(schema, f)
+
+    return Swagger(path, 'tests.controllers', name = name).router
+
+def call(router, path):
+    for regex, data in router.handlers.items():
+        match = re.match(regex, path.lstrip('/').partition('?')[0])
+
+        if match:
+            return data['view'](RequestFactory().get(path), **match.groupdict())
+
+def test_schemas_sharing_controllers_are_isolated(tmpdir):
+    v1 = mount(tmpdir, 'shared-v1', '/v1', 10)
+    v2 = mount(tmpdir, 'shared-v2', '/v2', 2)
+
+    # every schema wraps its own subclass, shared controller stays untouched
+    assert v1.views['PetViewSet'] is not v2.views['PetViewSet']
+    assert issubclass(v1.views['PetViewSet'], PetViewSet)
+    assert 'list' not in PetViewSet.__dict__
+
+    assert call(v1, '/v1/pets?ids=1,2,3').status_code == 200
+    assert call(v2, '/v2/pets?ids=1,2,3').status_code == 400
+    assert call(v2, '/v2/pets?ids=1,2').status_code == 200
@@ -0,0 +1,41 @@
+import os
+import json
+import gzip
+
+from django.test import RequestFactory, override_settings
+
+from djsw_wrapper.core import Swagger
+from djsw_wrapper.router import SPEC_NAME
+from djsw_wrapper.spec import SwaggerSpec
+
+from tests.conftest import SCHEMAS
+
+def load_schema(name):
+    return Swagger(os.path.join(SCHEMAS, 'petstore.yaml'), 'tests.controllers', name = name).get_schema()
+
+def test_spec_with_int_and_default_responses():
+    with override_settings(SWAGGER_SERVE_SPEC = True):
+        swagger = Swagger(os.path.join(SCHEMAS, 'petstore.yaml'), 'tests.controllers', name = 'spec')
+
+    responses = swagger.get_schema()['paths']['/pets']['get']['responses']
+
+    assert 200 in responses and 'default' in responses
+    assert SPEC_NAME + '-json' in [ x.name for x in swagger.router.links ]
+
+def test_spec_is_stable_and_conditional():
+    schema = load_schema('spec-conditional')
+    spec = SwaggerSpec(schema)
+
+    assert spec.digest == SwaggerSpec(schema).digest
+
+    request = RequestFactory().get('/api/swagger.json', HTTP_ACCEPT_ENCODING = 'gzip')
+    response = spec.serve(request, 'json')
+    data = json.loads(gzip.decompress(response.content).decode('utf-8'))
+
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip'
+    assert set(data['paths']['/pets']['get']['responses']) == set(['200', 'default'])
+
+    request = RequestFactory().get('/api/swagger.json', HTTP_ACCEPT_ENCODING = 'gzip', HTTP_IF_NONE_MATCH = response['ETag'])
+
+    assert spec.serve(request, 'json').status_code == 304
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from django.test import Client
+from django.contrib.auth.models import User
+from django.middleware.csrf import _get_new_csrf_token
+
+from djsw_wrapper.uploads import SwaggerUploadHandler
+
+def upload(content, content_type = 'image/png'):
+    f = io.BytesIO(content)
+    f.name = 'photo.png'
+    f.content_type = content_type
+
+    return f
+
+@pytest.fixture
+def client():
+    # logged in session: DRF session authentication reads the form for CSRF check
+    user, created = User.objects.get_or_create(username = 'uploader')
+    client = Client(enforce_csrf_checks = True)
+    client.force_login(user)
+    client.cookies['csrftoken'] = _get_new_csrf_token()
+
+    return client
+
+@pytest.fixture
+def chunks(monkeypatch):
+    calls = []
+    original = SwaggerUploadHandler.receive_data_chunk
+
+    def receive_data_chunk(self, raw_data, start):
+        calls.append(len(raw_data))
+        return original(self, raw_data, start)
+
+    monkeypatch.setattr(SwaggerUploadHandler, 'receive_data_chunk', receive_data_chunk)
+
+    return calls
+
+def post(client, content, content_type = 'image/png'):
+    data = { 'csrfmiddlewaretoken' : client.cookies['csrftoken'].value, 'photo' : upload(content, content_type) }
+
+    return client.post('/api/photos/1', data)
+
+def test_accepted_upload(client, chunks):
+    response = post(client, b'x' * 100)
+
+    assert response.status_code == 200
+    assert response.data == { 'size' : 100 }
+    assert chunks
+
+def test_oversized_upload_is_rejected_while_streaming(client, chunks):
+    response = post(client, b'x' * 100 * 1024)
+
+    assert response.status_code == 413
+    assert chunks and sum(chunks) < 100 * 1024
+
+def test_wrong_type_is_rejected_before_data(client, chunks):
+    response = post(client, b'x' * 100, 'text/plain')
+
+    assert response.status_code == 415
+    assert not chunks
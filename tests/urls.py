@@ -0,0 +1,3 @@
+from djsw_wrapper.router import SwaggerRouter
+
+urlpatterns = SwaggerRouter.all_urls()